@@ -1,5 +1,11 @@
 import reflex as rx
-from app.components.timeline_card import timeline_card
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from app.engine.actions import action_dispatcher
+from app.engine.metrics import playback_metrics
+from app.components.timeline_list import timeline_list
 from app.components.timeline_create import timeline_create
 from app.components.global_controls import global_controls
 from app.states.timeline_state import TimelineState
@@ -21,21 +27,21 @@ def index() -> rx.Component:
             ),
             rx.el.div(global_controls(), class_name="w-full px-4 mb-2"),
             rx.el.div(timeline_create(), class_name="w-full px-4 mb-6"),
-            rx.el.div(
-                rx.foreach(
-                    TimelineState.timelines,
-                    lambda timeline: rx.el.div(
-                        timeline_card(timeline), class_name="mb-6"
-                    ),
-                ),
-                class_name="w-full px-4",
-            ),
+            timeline_list(),
             class_name="flex flex-col items-center min-h-screen py-12 bg-gray-50/50",
         ),
         class_name="font-['Montserrat'] bg-gray-50 min-h-screen antialiased text-gray-900",
     )
 
 
+async def metrics(request: Request) -> PlainTextResponse:
+    """Playback and action metrics of this backend process for Prometheus."""
+    return PlainTextResponse(
+        playback_metrics.render(action_dispatcher),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 app = rx.App(
     theme=rx.theme(appearance="light"),
     head_components=[
@@ -45,6 +51,8 @@ app = rx.App(
             href="https://fonts.googleapis.com/css2?family=Montserrat:wght@400;500;600;700&display=swap",
             rel="stylesheet",
         ),
+        rx.script(src="/playhead.js"),
     ],
+    api_transformer=Starlette(routes=[Route("/metrics", metrics)]),
 )
-app.add_page(index, route="/")
\ No newline at end of file
+app.add_page(index, route="/", on_load=TimelineState.load_timeline_window)
\ No newline at end of file
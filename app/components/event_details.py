@@ -1,5 +1,5 @@
 import reflex as rx
-from app.states.timeline_state import TimelineItem, EventLog
+from app.states.timeline_state import TimelineItem, EventLog, TimelineState
 
 
 def log_item(log: EventLog) -> rx.Component:
@@ -19,21 +19,61 @@ def log_item(log: EventLog) -> rx.Component:
     )
 
 
+def page_button(label: str, on_click: rx.event.EventType) -> rx.Component:
+    return rx.el.button(
+        label,
+        on_click=on_click,
+        class_name="text-xs text-purple-600 hover:text-purple-800 font-medium px-2 py-1 rounded hover:bg-purple-50 transition-colors",
+    )
+
+
+def log_pager(timeline: TimelineItem) -> rx.Component:
+    """Pages through the timeline's log store instead of shipping every row."""
+    timeline_id = timeline["id"]
+    offset = TimelineState.log_offsets[timeline_id]
+    count = TimelineState.log_available[timeline_id]
+    page_length = TimelineState.log_pages[timeline_id].length()
+    return rx.el.div(
+        rx.cond(
+            offset > 0,
+            page_button("Newer", TimelineState.newer_logs(timeline_id)),
+            rx.el.span(),
+        ),
+        rx.el.span(
+            f"{offset + 1}–{offset + page_length} of {count}",
+            class_name="text-xs text-gray-500 font-mono",
+        ),
+        rx.cond(
+            offset + page_length < count,
+            page_button("Older", TimelineState.older_logs(timeline_id)),
+            rx.el.span(),
+        ),
+        class_name="flex items-center justify-between pt-2",
+    )
+
+
 def event_details(timeline: TimelineItem) -> rx.Component:
+    timeline_id = timeline["id"]
+    count = TimelineState.log_counts[timeline_id]
+    is_open = TimelineState.log_pages.contains(timeline_id)
     return rx.el.div(
         rx.el.details(
             rx.el.summary(
                 rx.el.span("Event Logs", class_name="font-medium text-gray-700"),
                 rx.el.span(
-                    f"{timeline['logs'].length()} events",
+                    f"{count} events",
                     class_name="ml-auto text-xs bg-gray-100 text-gray-600 px-2 py-1 rounded-full",
                 ),
+                on_click=[rx.prevent_default, TimelineState.toggle_logs(timeline_id)],
                 class_name="flex items-center cursor-pointer p-4 list-none outline-none",
             ),
             rx.el.div(
                 rx.cond(
-                    timeline["logs"].length() > 0,
-                    rx.foreach(timeline["logs"], log_item),
+                    is_open & (count > 0),
+                    rx.fragment(
+                        rx.foreach(TimelineState.log_pages[timeline_id], log_item),
+                        log_pager(timeline),
+                    ),
                     rx.el.p(
                         "No events triggered yet.",
                         class_name="text-xs text-gray-400 italic text-center py-4",
@@ -41,6 +81,7 @@ def event_details(timeline: TimelineItem) -> rx.Component:
                 ),
                 class_name="px-4 pb-4 max-h-48 overflow-y-auto custom-scrollbar",
             ),
+            open=is_open,
             class_name="group open:bg-gray-50/50 transition-colors duration-200",
         ),
         class_name="mt-4 border-t border-gray-100",
@@ -1,5 +1,23 @@
 import reflex as rx
-from app.states.timeline_state import TimelineState
+from reflex.components.el.elements.forms import Input
+from reflex.event import no_args_event_spec
+from app.engine.clock import PLAYBACK_RATES
+from app.states.timeline_state import SEEK_MODES, TimelineState
+
+# Scrub previews are sent at most once per frame at 60 Hz, stamped with the
+# client's clock so the server can drop those that arrive out of date.
+SCRUB_PREVIEW_MS = 16
+SEND_TIME = rx.Var("Date.now()").to(float)
+
+
+class PlayheadSlider(Input):
+    """A range input that also reports pointer releases.
+
+    Pointer events cover mouse, touch and pen alike, so a scrub is
+    committed however the slider was dragged.
+    """
+
+    on_pointer_up: rx.EventHandler[no_args_event_spec]
 
 
 def control_button(
@@ -19,6 +37,49 @@ def control_button(
     )
 
 
+def commit_scrub() -> rx.event.EventSpec:
+    """Seeks to the slider's value when the user lets go of it."""
+    return TimelineState.commit_seek(
+        rx.Var("document.querySelector('[data-playhead-slider]').value").to(str),
+        SEND_TIME,
+    )
+
+
+def session_controls() -> rx.Component:
+    """Joins or leaves a shared playback session."""
+    return rx.cond(
+        TimelineState.session_name != "",
+        rx.el.div(
+            rx.icon("radio", class_name="h-4 w-4 text-green-600 mr-2"),
+            rx.el.span(
+                f"Shared session {TimelineState.session_name} · {TimelineState.session_viewers} watching",
+                class_name="text-sm text-gray-700",
+            ),
+            rx.el.button(
+                "Leave",
+                on_click=TimelineState.leave_session,
+                class_name="ml-auto px-3 py-1 text-sm text-gray-600 border border-gray-300 rounded-lg hover:bg-gray-100",
+            ),
+            class_name="flex items-center mt-4",
+        ),
+        rx.el.div(
+            rx.el.input(
+                placeholder="Shared session name",
+                on_change=TimelineState.set_new_session_name,
+                default_value=TimelineState.new_session_name,
+                class_name="flex-1 px-3 py-1 text-sm border border-gray-300 rounded-lg focus:ring-2 focus:ring-purple-500 focus:border-transparent outline-none",
+            ),
+            rx.el.button(
+                rx.icon("users", class_name="h-4 w-4 mr-2"),
+                "Join",
+                on_click=TimelineState.join_session,
+                class_name="flex items-center ml-2 px-3 py-1 text-sm text-purple-700 border border-purple-200 rounded-lg hover:bg-purple-50",
+            ),
+            class_name="flex items-center mt-4",
+        ),
+    )
+
+
 def global_controls() -> rx.Component:
     return rx.el.div(
         rx.el.div(
@@ -39,6 +100,7 @@ def global_controls() -> rx.Component:
                 rx.el.div(
                     rx.el.span(
                         TimelineState.formatted_global_time,
+                        data_playhead_clock="",
                         class_name="text-xl font-bold font-mono text-gray-900 min-w-[80px] text-center",
                     ),
                     rx.el.span("/", class_name="text-gray-400 mx-2 text-lg"),
@@ -49,23 +111,52 @@ def global_controls() -> rx.Component:
                     class_name="flex items-center mr-6",
                 ),
                 rx.el.div(
-                    rx.el.input(
+                    PlayheadSlider.create(
                         type="range",
                         min="0",
                         max=TimelineState.global_max_duration.to_string(),
                         step="0.1",
                         default_value=TimelineState.global_current_time,
-                        key=TimelineState.global_current_time.to_string(),
-                        on_change=lambda val: TimelineState.global_seek.throttle(100)(
-                            val
-                        ),
-                        class_name="w-full h-3 bg-gray-200 rounded-lg appearance-none cursor-pointer accent-purple-600 hover:accent-purple-700 transition-all",
+                        data_playhead_slider="",
+                        on_change=lambda value: TimelineState.preview_seek(
+                            value, SEND_TIME
+                        ).throttle(SCRUB_PREVIEW_MS),
+                        on_pointer_up=commit_scrub(),
+                        on_key_up=commit_scrub(),
+                        class_name="w-full h-3 bg-gray-200 rounded-lg appearance-none cursor-pointer touch-none accent-purple-600 hover:accent-purple-700 transition-all",
                     ),
                     class_name="flex-1 flex items-center",
                 ),
+                rx.el.select(
+                    *[
+                        rx.el.option(f"{rate:g}×", value=f"{rate:g}")
+                        for rate in PLAYBACK_RATES
+                    ],
+                    value=TimelineState.playback_rate.to_string(),
+                    on_change=TimelineState.set_playback_rate,
+                    title="Playback Speed",
+                    class_name="ml-4 px-3 py-1 border border-gray-300 rounded-lg font-mono text-sm text-gray-700 bg-white cursor-pointer outline-none focus:ring-2 focus:ring-purple-500",
+                ),
+                rx.el.select(
+                    *[
+                        rx.el.option(mode.capitalize(), value=mode)
+                        for mode in SEEK_MODES
+                    ],
+                    value=TimelineState.seek_mode,
+                    on_change=TimelineState.set_seek_mode,
+                    title="Seek Mode",
+                    class_name="ml-2 px-3 py-1 border border-gray-300 rounded-lg text-sm text-gray-700 bg-white cursor-pointer outline-none focus:ring-2 focus:ring-purple-500",
+                ),
                 class_name="flex items-center flex-1 p-4 bg-gray-50 rounded-xl border border-gray-200",
             ),
             class_name="flex flex-col md:flex-row items-center justify-between w-full gap-4",
         ),
+        session_controls(),
+        data_playback_anchor="",
+        data_position=TimelineState.playback_anchor["position"],
+        data_wall_time=TimelineState.playback_anchor["wall_time"],
+        data_rate=TimelineState.playback_anchor["rate"],
+        data_playing=TimelineState.playback_anchor["is_playing"],
+        data_max=TimelineState.global_max_duration,
         class_name="sticky top-4 z-50 bg-white/95 backdrop-blur-sm rounded-2xl p-6 border border-purple-100 shadow-xl w-full max-w-4xl mx-auto mb-8 transition-all duration-300 hover:shadow-2xl",
     )
\ No newline at end of file
@@ -29,5 +29,25 @@ def timeline_create() -> rx.Component:
             ),
             class_name="flex flex-col sm:flex-row gap-3",
         ),
+        rx.el.div(
+            rx.upload.root(
+                rx.el.button(
+                    rx.icon("upload", class_name="h-4 w-4 mr-2"),
+                    "Import JSONL / CSV",
+                    class_name="flex items-center px-4 py-2 border border-purple-200 text-purple-700 text-sm font-medium rounded-lg hover:bg-purple-50 transition-colors",
+                ),
+                id="timeline_import",
+                accept={
+                    "application/x-ndjson": [".jsonl", ".ndjson"],
+                    "text/csv": [".csv"],
+                },
+                multiple=True,
+                on_drop=TimelineState.import_timeline_files(
+                    rx.upload_files(upload_id="timeline_import")
+                ),
+            ),
+            rx.el.span(TimelineState.import_status, class_name="text-xs text-gray-500"),
+            class_name="flex flex-col sm:flex-row sm:items-center gap-3 mt-4",
+        ),
         class_name="bg-white rounded-2xl p-6 border border-gray-100 shadow-sm w-full max-w-4xl mx-auto mb-8",
     )
\ No newline at end of file
@@ -0,0 +1,54 @@
+import reflex as rx
+from app.components.timeline_card import timeline_card
+from app.states.timeline_state import TIMELINE_ROW_HEIGHT, TimelineState
+
+LIST_ID = "timeline_list"
+
+
+def report_viewport() -> rx.event.EventSpec:
+    """Sends where the list sits in the viewport, read when the event fires."""
+    return TimelineState.scroll_timelines(
+        rx.Var(
+            f"(document.getElementById('{LIST_ID}')?.getBoundingClientRect().top ?? 0)"
+        ).to(float),
+        rx.Var("window.innerHeight").to(float),
+    )
+
+
+def spacer(cards: rx.Var) -> rx.Component:
+    """Stands in for cards outside the window, keeping the scrollbar honest."""
+    return rx.el.div(style={"height": f"{cards * TIMELINE_ROW_HEIGHT}px"})
+
+
+def timeline_list() -> rx.Component:
+    """Renders only the window of cards the server published, between spacers.
+
+    Scrolling reports the viewport throttled while it moves and once more
+    when it stops, and the server answers with the cards around it.
+    """
+    return rx.el.div(
+        rx.window_event_listener(on_scroll=report_viewport().throttle(150)),
+        rx.window_event_listener(
+            on_scroll=report_viewport().debounce(150),
+            on_resize=report_viewport().debounce(150),
+        ),
+        spacer(TimelineState.timeline_offset),
+        rx.foreach(
+            TimelineState.timelines,
+            lambda timeline: rx.el.div(
+                timeline_card(timeline),
+                # Every row is exactly as tall as the spacers assume; a card
+                # that grows, e.g. with its logs open, scrolls inside it.
+                class_name="pb-6 overflow-y-auto",
+                style={"height": f"{TIMELINE_ROW_HEIGHT}px"},
+            ),
+        ),
+        spacer(
+            TimelineState.timeline_total
+            - TimelineState.timeline_offset
+            - TimelineState.timelines.length()
+        ),
+        id=LIST_ID,
+        on_mount=report_viewport(),
+        class_name="w-full px-4",
+    )
\ No newline at end of file
@@ -1,10 +1,51 @@
 import reflex as rx
-from app.states.timeline_state import TimelineItem, TimelineEvent
+from app.states.timeline_state import (
+    EventBin,
+    EventDot,
+    TimelineItem,
+    TimelineState,
+)
 
 
-def event_dot(event: TimelineEvent, duration: float) -> rx.Component:
+def detail_key(timeline: TimelineItem, event: EventDot) -> str:
+    return f"{timeline['id']}/{event['index']}"
+
+
+def load_detail(timeline: TimelineItem, event: EventDot) -> rx.Var:
+    """Loads the tooltip's label and description on the first hover or click.
+
+    While they are in event_details the browser does not ask again.
+    """
+    return rx.cond(
+        TimelineState.event_details.contains(detail_key(timeline, event)),
+        rx.noop(),
+        TimelineState.load_event_detail(timeline["id"], event["index"]),
+    )
+
+
+def event_tooltip(timeline: TimelineItem, event: EventDot, status: str) -> rx.Component:
+    key = detail_key(timeline, event)
+    detail = TimelineState.event_details[key]
+    loaded = TimelineState.event_details.contains(key)
+    return rx.el.div(
+        rx.el.span(
+            rx.cond(loaded, detail["label"], "Loading…"),
+            class_name="font-bold block text-xs mb-1",
+        ),
+        rx.el.span(
+            f"({status})",
+            class_name="text-[9px] uppercase tracking-wider opacity-70 block mb-1",
+        ),
+        rx.cond(
+            loaded,
+            rx.el.span(detail["description"], class_name="text-[10px] opacity-90"),
+        ),
+        class_name="absolute bottom-full left-1/2 -translate-x-1/2 mb-2 w-36 p-2 bg-gray-800 text-white text-xs rounded opacity-0 group-hover:opacity-100 transition-opacity duration-200 pointer-events-none z-10 shadow-lg",
+    )
+
+
+def event_dot(timeline: TimelineItem, event: EventDot, status: str) -> rx.Component:
     """Renders a single event dot on the timeline."""
-    position_left = rx.cond(duration > 0, event["time"] / duration * 100, 0)
     base_style = "rounded-full border-2 border-white shadow-sm transform transition-all duration-300 hover:scale-125 cursor-pointer"
     type_style = rx.cond(
         event["type"] == "conflict",
@@ -13,31 +54,21 @@ def event_dot(event: TimelineEvent, duration: float) -> rx.Component:
             event["type"] == "proposal", "w-4 h-4 bg-purple-500", "w-3 h-3 bg-gray-500"
         ),
     )
-    status_style = rx.cond(
-        event["status"] == "triggered",
-        "opacity-100 ring-2 ring-offset-1 ring-green-400",
+    status_style = rx.match(
+        status,
+        ("triggered", "opacity-100 ring-2 ring-offset-1 ring-green-400"),
+        ("completed", "opacity-100 ring-2 ring-offset-1 ring-green-600"),
+        ("failed", "opacity-100 ring-2 ring-offset-1 ring-red-500"),
         "opacity-50 hover:opacity-80",
     )
     return rx.el.div(
         rx.el.div(
             rx.el.div(
-                rx.el.div(
-                    rx.el.span(
-                        event["label"], class_name="font-bold block text-xs mb-1"
-                    ),
-                    rx.el.span(
-                        f"({event['status']})",
-                        class_name="text-[9px] uppercase tracking-wider opacity-70 block mb-1",
-                    ),
-                    rx.el.span(
-                        event["description"], class_name="text-[10px] opacity-90"
-                    ),
-                    class_name="absolute bottom-full left-1/2 -translate-x-1/2 mb-2 w-36 p-2 bg-gray-800 text-white text-xs rounded opacity-0 group-hover:opacity-100 transition-opacity duration-200 pointer-events-none z-10 shadow-lg",
-                ),
+                event_tooltip(timeline, event, status),
                 class_name=f"{base_style} {type_style} {status_style}",
             ),
             rx.cond(
-                event["status"] == "triggered",
+                status == "triggered",
                 rx.el.div(
                     class_name="absolute inset-0 rounded-full animate-ping opacity-75 bg-green-400"
                 ),
@@ -45,8 +76,99 @@ def event_dot(event: TimelineEvent, duration: float) -> rx.Component:
             ),
             class_name="relative",
         ),
+        on_mouse_enter=load_detail(timeline, event),
+        on_click=load_detail(timeline, event),
         class_name="absolute top-1/2 -translate-y-1/2 group z-30",
-        style={"left": f"{position_left}%"},
+        style={"left": f"{event['left']}%"},
+    )
+
+
+def event_span(timeline: TimelineItem, event: EventDot, status: str) -> rx.Component:
+    """Renders an interval event as a bar from its start to its end.
+
+    The bar is solid while the event is active: entered, and its end not
+    yet reached by the playhead.
+    """
+    active = (event["index"] < TimelineState.triggered_counts[timeline["id"]]) & (
+        event["end"] > TimelineState.global_current_time
+    )
+    type_style = rx.cond(
+        event["type"] == "conflict",
+        "bg-red-500",
+        rx.cond(event["type"] == "proposal", "bg-purple-500", "bg-gray-500"),
+    )
+    status_style = rx.cond(
+        active,
+        "opacity-100 ring-2 ring-offset-1 ring-green-400",
+        rx.match(
+            status,
+            ("failed", "opacity-60 ring-2 ring-offset-1 ring-red-500"),
+            ("pending", "opacity-40 hover:opacity-70"),
+            "opacity-60",
+        ),
+    )
+    return rx.el.div(
+        event_tooltip(timeline, event, status),
+        on_mouse_enter=load_detail(timeline, event),
+        on_click=load_detail(timeline, event),
+        class_name=f"absolute top-1/2 -translate-y-1/2 h-2 rounded-full border border-white shadow-sm cursor-pointer transition-opacity duration-300 group z-20 {type_style} {status_style}",
+        style={"left": f"{event['left']}%", "width": f"{event['width']}%"},
+    )
+
+
+def bin_triggered(timeline: TimelineItem, bin: EventBin) -> rx.Var:
+    """Derives how many of a bin's events were triggered from the cursor."""
+    cursor = TimelineState.triggered_counts[timeline["id"]]
+    return rx.cond(
+        cursor <= bin["first"],
+        0,
+        rx.cond(
+            cursor >= bin["first"] + bin["count"],
+            bin["count"],
+            cursor - bin["first"],
+        ),
+    )
+
+
+def bin_status(timeline: TimelineItem, bin: EventBin, status: str) -> rx.Var:
+    """Counts a bin's running or failed actions; most bins have none."""
+    statuses = TimelineState.bin_statuses[timeline["id"]]
+    key = bin["first"].to_string()
+    return rx.cond(
+        TimelineState.bin_statuses.contains(timeline["id"]) & statuses.contains(key),
+        statuses[key][status],
+        0,
+    )
+
+
+def density_marker(timeline: TimelineItem, bin: EventBin) -> rx.Component:
+    """Renders a bin of events as one bar; clicking it zooms into the bin."""
+    triggered = bin_triggered(timeline, bin)
+    active = bin_status(timeline, bin, "active")
+    failed = bin_status(timeline, bin, "failed")
+    type_style = rx.cond(
+        bin["conflicts"] >= bin["proposals"],
+        rx.cond(bin["conflicts"] > 0, "bg-red-300", "bg-gray-300"),
+        "bg-purple-300",
+    )
+    status_style = rx.cond(
+        failed > 0,
+        "ring-1 ring-red-500",
+        rx.cond(active > 0, "ring-1 ring-green-400 animate-pulse", ""),
+    )
+    return rx.el.div(
+        rx.el.div(
+            class_name="absolute bottom-0 left-0 right-0 bg-green-500",
+            style={"height": f"{triggered / bin['count'] * 100}%"},
+        ),
+        on_click=TimelineState.zoom_timeline(timeline["id"], bin["start"], bin["end"]),
+        title=f"{bin['count']} events: {bin['conflicts']} conflicts, {bin['proposals']} proposals, {triggered} triggered, {active} running, {failed} failed",
+        class_name=f"absolute bottom-1/2 rounded-sm overflow-hidden cursor-zoom-in hover:opacity-80 {type_style} {status_style}",
+        style={
+            "left": f"{bin['left']}%",
+            "width": f"max(2px, calc({bin['width']}% - 1px))",
+            "height": f"{8 + bin['weight'] * 28}px",
+        },
     )
 
 
@@ -58,7 +180,97 @@ def time_marker(percent: int) -> rx.Component:
     )
 
 
+def progress_percent(timeline: TimelineItem) -> rx.Var:
+    """Derives the playhead's place in a timeline's zoom window on the client."""
+    view = TimelineState.timeline_views[timeline["id"]]
+    current_time = rx.cond(
+        TimelineState.global_current_time < timeline["duration"],
+        TimelineState.global_current_time,
+        timeline["duration"],
+    )
+    return rx.cond(
+        view["end"] > view["start"],
+        rx.cond(
+            current_time <= view["start"],
+            0,
+            rx.cond(
+                current_time >= view["end"],
+                100,
+                (current_time - view["start"]) / (view["end"] - view["start"]) * 100,
+            ),
+        ),
+        0,
+    )
+
+
+def event_status(timeline: TimelineItem, index: int) -> rx.Var:
+    """Events below the timeline's triggered count have been triggered.
+
+    Their action has completed unless it is still listed in action_statuses.
+    """
+    action_status = TimelineState.action_statuses[timeline["id"]][index]
+    return rx.cond(
+        index < TimelineState.triggered_counts[timeline["id"]],
+        rx.cond(action_status, action_status, "completed"),
+        "pending",
+    )
+
+
+def zoom_button(icon_name: str, on_click: rx.event.EventType, title: str):
+    return rx.el.button(
+        rx.icon(icon_name, class_name="h-4 w-4"),
+        on_click=on_click,
+        title=title,
+        class_name="p-1 text-gray-500 hover:text-gray-900 hover:bg-gray-100 rounded",
+    )
+
+
+def active_summary(timeline: TimelineItem) -> rx.Component:
+    """Shows how many interval events are active and the first few labels."""
+    count = TimelineState.active_counts[timeline["id"]]
+    labels = TimelineState.active_labels[timeline["id"]]
+    return rx.el.span(
+        f"{count} active",
+        rx.cond(count > 0, f": {labels.join(', ')}", ""),
+        rx.cond(count > labels.length(), ", …", ""),
+        title=labels.join(", "),
+        class_name="ml-3 truncate max-w-xs text-green-700",
+    )
+
+
+def zoom_controls(timeline: TimelineItem) -> rx.Component:
+    view = TimelineState.timeline_views[timeline["id"]]
+    layer = TimelineState.timeline_layers[timeline["id"]]
+    return rx.el.div(
+        rx.el.span(
+            view["label"],
+            class_name="font-mono",
+        ),
+        rx.el.span(
+            f"{layer['visible']} of {timeline['event_count']} events",
+            rx.cond(layer["bins"].length() > 0, " (binned)", ""),
+            class_name="ml-3",
+        ),
+        rx.cond(
+            TimelineState.active_counts.contains(timeline["id"]),
+            active_summary(timeline),
+        ),
+        rx.el.div(
+            zoom_button("zoom-in", TimelineState.zoom_in(timeline["id"]), "Zoom in"),
+            zoom_button("zoom-out", TimelineState.zoom_out(timeline["id"]), "Zoom out"),
+            zoom_button(
+                "maximize-2", TimelineState.reset_zoom(timeline["id"]), "Whole timeline"
+            ),
+            class_name="flex items-center ml-auto",
+        ),
+        class_name="flex items-center text-xs text-gray-500",
+    )
+
+
 def timeline_vis(timeline: TimelineItem) -> rx.Component:
+    progress = progress_percent(timeline)
+    view = TimelineState.timeline_views[timeline["id"]]
+    layer = TimelineState.timeline_layers[timeline["id"]]
     return rx.el.div(
         rx.el.div(
             time_marker(0),
@@ -72,21 +284,42 @@ def timeline_vis(timeline: TimelineItem) -> rx.Component:
             class_name="absolute top-1/2 left-0 w-full h-1 bg-gray-200 rounded-full -translate-y-1/2"
         ),
         rx.el.div(
-            class_name="absolute top-1/2 left-0 h-1 bg-purple-600 rounded-full -translate-y-1/2 transition-all duration-100 ease-linear",
-            style={"width": f"{timeline['progress_percent']}%"},
+            class_name="absolute top-1/2 left-0 h-1 bg-purple-600 rounded-full -translate-y-1/2",
+            style={"width": f"{progress}%"},
+            data_playhead_duration=timeline["duration"],
+            data_playhead_start=view["start"],
+            data_playhead_end=view["end"],
+            data_playhead_prop="width",
         ),
         rx.el.div(
-            class_name="absolute top-1/2 w-4 h-4 bg-white border-2 border-purple-600 rounded-full -translate-y-1/2 shadow-md transition-all duration-100 ease-linear z-20 cursor-grab active:cursor-grabbing",
+            class_name="absolute top-1/2 w-4 h-4 bg-white border-2 border-purple-600 rounded-full -translate-y-1/2 shadow-md z-20 cursor-grab active:cursor-grabbing",
             style={
-                "left": f"{timeline['progress_percent']}%",
+                "left": f"{progress}%",
                 "transform": "translate(-50%, -50%)",
             },
+            data_playhead_duration=timeline["duration"],
+            data_playhead_start=view["start"],
+            data_playhead_end=view["end"],
+            data_playhead_prop="left",
         ),
-        rx.el.div(
-            rx.foreach(
-                timeline["events"], lambda event: event_dot(event, timeline["duration"])
+        rx.cond(
+            TimelineState.timeline_layers.contains(timeline["id"]),
+            rx.el.div(
+                rx.foreach(
+                    layer["dots"],
+                    lambda event: rx.cond(
+                        event["width"] > 0,
+                        event_span(
+                            timeline, event, event_status(timeline, event["index"])
+                        ),
+                        event_dot(
+                            timeline, event, event_status(timeline, event["index"])
+                        ),
+                    ),
+                ),
+                rx.foreach(layer["bins"], lambda bin: density_marker(timeline, bin)),
+                class_name="absolute inset-0 z-10",
             ),
-            class_name="absolute inset-0 z-10",
         ),
         class_name="relative w-full h-24 bg-gray-50/50 rounded-xl border border-gray-100 overflow-visible mt-4 mb-2 select-none",
     )
\ No newline at end of file
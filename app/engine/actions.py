@@ -0,0 +1,264 @@
+import asyncio
+import inspect
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+ActionHandler = Callable[["ActionJob"], Awaitable[str | None] | str | None]
+
+
+def describe_action(event: dict) -> str:
+    """Returns the log message for an event that was just triggered."""
+    if event["type"] == "conflict":
+        return f"CONFLICT DETECTED: Logging incident {event['id']}"
+    if event["type"] == "proposal":
+        return f"PROPOSAL SENT: Dispatching proposal {event['id']}"
+    return f"EVENT TRIGGERED: Processing generic event {event['id']}"
+
+
+def describe_exit(event: dict) -> str:
+    """Returns the log message for an interval event that just ended."""
+    if event["type"] == "conflict":
+        return f"CONFLICT ENDED: Closing incident {event['id']}"
+    if event["type"] == "proposal":
+        return f"PROPOSAL ENDED: Closing proposal {event['id']}"
+    return f"EVENT ENDED: Finished generic event {event['id']}"
+
+
+class ActionJob:
+    """A triggered event waiting for its backend action to run.
+
+    `transition` is "enter" when the playhead reached the event and "exit"
+    when it passed the end of an interval event.
+    """
+
+    def __init__(
+        self,
+        timeline_id: str,
+        timeline_type: str,
+        event_index: int,
+        event: dict,
+        reply: Callable[["ActionResult"], Awaitable[None]] | None = None,
+        transition: str = "enter",
+    ):
+        self.timeline_id = timeline_id
+        self.timeline_type = timeline_type
+        self.event_index = event_index
+        self.event = event
+        self.reply = reply
+        self.transition = transition
+
+
+class ActionResult:
+    """Outcome of an action, reported back to whoever triggered it."""
+
+    def __init__(self, job: ActionJob, status: str, message: str, seconds: float):
+        self.timeline_id = job.timeline_id
+        self.event_index = job.event_index
+        self.event = job.event
+        self.transition = job.transition
+        self.status = status
+        self.message = message
+        self.seconds = seconds
+
+
+class ActionRegistry:
+    """Action handlers keyed by event type, timeline type and transition.
+
+    A handler registered for both types wins over one registered for the
+    event type only, which wins over one for the timeline type only.
+    Handlers run when an event is entered unless registered for the "exit"
+    transition. Events without any handler need no action and complete
+    immediately.
+    """
+
+    def __init__(self):
+        self._handlers: dict[tuple[str | None, str | None, str], ActionHandler] = {}
+
+    def register(
+        self,
+        event_type: str | None = None,
+        timeline_type: str | None = None,
+        transition: str = "enter",
+    ):
+        def decorator(handler: ActionHandler) -> ActionHandler:
+            self._handlers[(event_type, timeline_type, transition)] = handler
+            return handler
+
+        return decorator
+
+    def resolve(
+        self, event_type: str, timeline_type: str, transition: str = "enter"
+    ) -> ActionHandler | None:
+        for key in (
+            (event_type, timeline_type, transition),
+            (event_type, None, transition),
+            (None, timeline_type, transition),
+            (None, None, transition),
+        ):
+            handler = self._handlers.get(key)
+            if handler is not None:
+                return handler
+        return None
+
+
+class HandlerStats:
+    """Call counts and latency of one handler over its recent calls."""
+
+    def __init__(self, window: int = 512):
+        self.calls = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.recent: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float, failed: bool):
+        self.calls += 1
+        self.failures += failed
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.recent.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "mean_seconds": self.total_seconds / self.calls if self.calls else 0.0,
+            "p50_seconds": self.percentile(0.5),
+            "p95_seconds": self.percentile(0.95),
+            "max_seconds": self.max_seconds,
+        }
+
+
+class ActionDispatcher:
+    """Runs action handlers off the tick path on a bounded queue and worker pool.
+
+    `submit` waits while the queue is full, so a playback loop that triggers
+    actions faster than the handlers finish is held back instead of piling
+    up unbounded work.
+    """
+
+    def __init__(
+        self, registry: ActionRegistry, concurrency: int = 8, max_pending: int = 1000
+    ):
+        self.registry = registry
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.handler_stats: dict[str, HandlerStats] = {}
+        self.submitted = 0
+        self.blocked_submits = 0
+        self.in_flight = 0
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def has_handler(
+        self, event_type: str, timeline_type: str, transition: str = "enter"
+    ) -> bool:
+        return self.registry.resolve(event_type, timeline_type, transition) is not None
+
+    def _ensure_workers(self):
+        """Starts the worker pool on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._workers = [
+            loop.create_task(self._work(), name=f"timeline-action-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def submit(self, job: ActionJob) -> bool:
+        """Queues a job, waiting for room when the queue is full.
+
+        Returns False when no handler is registered for the event.
+        """
+        handler = self.registry.resolve(
+            job.event["type"], job.timeline_type, job.transition
+        )
+        if handler is None:
+            return False
+        self._ensure_workers()
+        if self._queue.full():
+            self.blocked_submits += 1
+        await self._queue.put((handler, job))
+        self.submitted += 1
+        return True
+
+    async def drain(self):
+        """Waits until every queued action has finished."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _work(self):
+        while True:
+            handler, job = await self._queue.get()
+            self.in_flight += 1
+            try:
+                await self._run(handler, job)
+            finally:
+                self.in_flight -= 1
+                self._queue.task_done()
+
+    async def _run(self, handler: ActionHandler, job: ActionJob):
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(handler):
+                message = await handler(job)
+            else:
+                message = await asyncio.to_thread(handler, job)
+            status = "completed"
+        except Exception as e:
+            logging.exception(f"Action {handler.__name__} failed for {job.event['id']}")
+            message = f"ACTION FAILED: {e}"
+            status = "failed"
+        seconds = time.perf_counter() - started
+        stats = self.handler_stats.setdefault(handler.__name__, HandlerStats())
+        stats.record(seconds, status == "failed")
+        if job.reply is not None:
+            try:
+                await job.reply(ActionResult(job, status, message or "", seconds))
+            except Exception:
+                logging.exception(
+                    f"Could not report action result for {job.event['id']}"
+                )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "max_pending": self.max_pending,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "blocked_submits": self.blocked_submits,
+            "handlers": {
+                name: stats.as_dict() for name, stats in self.handler_stats.items()
+            },
+        }
+
+
+action_registry = ActionRegistry()
+action_dispatcher = ActionDispatcher(
+    action_registry,
+    concurrency=int(os.environ.get("TIMELINE_ACTION_CONCURRENCY", "8")),
+    max_pending=int(os.environ.get("TIMELINE_ACTION_QUEUE_SIZE", "1000")),
+)
+
+
+@action_registry.register("conflict")
+async def log_conflict(job: ActionJob) -> None:
+    logging.info(f"[Backend] {describe_action(job.event)}")
+
+
+@action_registry.register("proposal")
+async def log_proposal(job: ActionJob) -> None:
+    logging.info(f"[Backend] {describe_action(job.event)}")
\ No newline at end of file
@@ -0,0 +1,54 @@
+import time
+
+PLAYBACK_RATES = [0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0]
+MIN_PLAYBACK_RATE = PLAYBACK_RATES[0]
+MAX_PLAYBACK_RATE = PLAYBACK_RATES[-1]
+
+
+def format_time(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    secs = int(seconds % 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+
+class PlaybackClock:
+    """Playback position computed from a monotonic anchor and a rate.
+
+    The clock never accumulates steps: the position is always the anchor
+    position plus the real time elapsed since the anchor, scaled by the rate,
+    so a late tick lands exactly where an on-time one would have.
+    """
+
+    def __init__(self, position: float = 0.0, rate: float = 1.0):
+        self.anchor_position = position
+        self.anchor_wall = time.monotonic()
+        self.rate = rate
+        self.is_playing = False
+
+    def position(self, now: float | None = None) -> float:
+        """Returns the playback position at the given monotonic time."""
+        if not self.is_playing:
+            return self.anchor_position
+        if now is None:
+            now = time.monotonic()
+        return self.anchor_position + (now - self.anchor_wall) * self.rate
+
+    def _reanchor(self, position: float, now: float | None):
+        self.anchor_position = position
+        self.anchor_wall = time.monotonic() if now is None else now
+
+    def play(self, now: float | None = None):
+        self._reanchor(self.position(now), now)
+        self.is_playing = True
+
+    def pause(self, now: float | None = None):
+        self._reanchor(self.position(now), now)
+        self.is_playing = False
+
+    def seek(self, position: float, now: float | None = None):
+        self._reanchor(position, now)
+
+    def set_rate(self, rate: float, now: float | None = None):
+        """Changes the rate from the current position onwards."""
+        self._reanchor(self.position(now), now)
+        self.rate = min(max(rate, MIN_PLAYBACK_RATE), MAX_PLAYBACK_RATE)
\ No newline at end of file
@@ -0,0 +1,129 @@
+import heapq
+import math
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator
+
+
+class EventIndex:
+    """Sorted event times of one timeline with a cursor at the next pending event.
+
+    Events before ``cursor`` have been crossed by the playhead, so a tick only
+    has to look at the events between the cursor and the new playhead.
+    """
+
+    def __init__(self, times: list[float], cursor: int = 0):
+        self.times = times
+        self.cursor = cursor
+
+    def next_time(self) -> float | None:
+        """Returns the time of the next pending event, if any."""
+        if self.cursor < len(self.times):
+            return self.times[self.cursor]
+        return None
+
+    def advance(self, current_time: float) -> range:
+        """Moves the cursor past every event at or before current_time."""
+        start = self.cursor
+        if start >= len(self.times) or self.times[start] > current_time:
+            return range(start, start)
+        end = bisect_right(self.times, current_time, start)
+        self.cursor = end
+        return range(start, end)
+
+    def rewind(self, current_time: float) -> range:
+        """Moves the cursor back to current_time, returning the events it uncrossed."""
+        end = self.cursor
+        start = bisect_right(self.times, current_time, 0, end)
+        self.cursor = start
+        return range(start, end)
+
+    def reset(self) -> range:
+        """Moves the cursor back to the first event."""
+        crossed = range(0, self.cursor)
+        self.cursor = 0
+        return crossed
+
+
+class IntervalIndex:
+    """Start and end times of one timeline's events, for "active at t" queries.
+
+    An event is active from its start until its end, so point events never
+    are. The ends are kept sorted too, with an EventIndex over them as the
+    exit cursor: a tick crosses exits the way it crosses starts, and the
+    number of active events is the start cursor minus the exit cursor. A
+    segment tree of the latest end over the events in start order finds
+    which ones are active at any time in O(log n) per event found.
+    """
+
+    def __init__(self, times: array, ends: array):
+        self.times = times
+        self.ends = ends
+        count = len(times)
+        self.end_order = array("I", sorted(range(count), key=ends.__getitem__))
+        self.exits = EventIndex(array("d", (ends[i] for i in self.end_order)))
+        size = 1
+        while size < count:
+            size *= 2
+        tree = array("d", [-math.inf]) * (2 * size)
+        tree[size : size + count] = ends
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._size = size
+        self._tree = tree
+
+    def count(self, current_time: float) -> int:
+        """Returns how many events are active at current_time."""
+        return bisect_right(self.times, current_time) - bisect_right(
+            self.exits.times, current_time
+        )
+
+    def active(self, current_time: float, limit: int | None = None) -> list[int]:
+        """Returns the indexes of the events active at current_time, by start."""
+        stop = bisect_right(self.times, current_time)
+        tree, size = self._tree, self._size
+        found = []
+        stack = [(1, 0, size)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if lo >= stop or tree[node] <= current_time:
+                continue
+            if node >= size:
+                found.append(lo)
+                if len(found) == limit:
+                    break
+                continue
+            mid = (lo + hi) // 2
+            stack.append((2 * node + 1, mid, hi))
+            stack.append((2 * node, lo, mid))
+        return found
+
+    def _ended(self, crossed: range) -> list[int]:
+        """Maps exit cursor positions to the indexes of intervals, not points."""
+        return [
+            i
+            for i in map(self.end_order.__getitem__, crossed)
+            if self.ends[i] > self.times[i]
+        ]
+
+    def advance_exits(self, current_time: float) -> list[int]:
+        """Moves the exit cursor to current_time, returning the intervals that ended."""
+        return self._ended(self.exits.advance(current_time))
+
+    def rewind_exits(self, current_time: float) -> list[int]:
+        """Moves the exit cursor back, returning the intervals that no longer ended."""
+        return self._ended(self.exits.rewind(current_time))
+
+
+def firing_order(
+    times: array, ends: array, entered: Iterable[int], ended: Iterable[int]
+) -> Iterator[tuple[float, str, int]]:
+    """Yields (time, transition, event index) for one timeline in firing order.
+
+    Entered events fire at their time and ended interval events at their
+    end; ties go to entries before exits, then to the earlier event.
+    """
+    return heapq.merge(
+        ((times[i], "enter", i) for i in entered),
+        ((ends[i], "exit", i) for i in ended),
+    )
\ No newline at end of file
@@ -0,0 +1,180 @@
+import json
+import operator
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable
+
+
+class StringTable:
+    """Interns repeated strings as small integer codes."""
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: list[str] = []
+        self.codes: dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(sys.intern(value))
+            self.codes[value] = code
+        return code
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+
+class PackedStrings:
+    """Mostly unique strings packed into one UTF-8 buffer plus end offsets."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array("Q")
+
+    def append(self, value: str):
+        self.data += value.encode()
+        self.ends.append(len(self.data))
+
+    def __getitem__(self, i: int) -> str:
+        start = self.ends[i - 1] if i else 0
+        return self.data[start : self.ends[i]].decode()
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+
+class EventStore:
+    """Events of one timeline as parallel arrays, sorted by time.
+
+    Times and end times are float64 arrays that bisect searches directly;
+    a point event ends where it starts. Event types and labels, which
+    repeat, are codes into string tables; ids and descriptions, which
+    mostly do not, each share one byte buffer. An event costs a few dozen
+    bytes instead of a dict of strings, and dicts are only built by `event`
+    for the events a caller actually shows or fires.
+    """
+
+    def __init__(self):
+        self.times = array("d")
+        self.ends = array("d")
+        self.interval_count = 0
+        self.type_codes = array("H")
+        self.label_codes = array("I")
+        self.ids = PackedStrings()
+        self.descriptions = PackedStrings()
+        self.types = StringTable()
+        self.labels = StringTable()
+
+    @classmethod
+    def from_events(cls, events: Iterable[dict]) -> "EventStore":
+        """Builds a store from event dicts that are already sorted by time."""
+        store = cls()
+        for event in events:
+            store.append(
+                event["id"],
+                event["time"],
+                event["label"],
+                event["type"],
+                event["description"],
+                event.get("end"),
+            )
+        return store
+
+    def append(
+        self,
+        id: str,
+        time: float,
+        label: str,
+        type: str,
+        description: str,
+        end: float | None = None,
+    ):
+        if self.times and time < self.times[-1]:
+            raise ValueError("Events must be appended in time order")
+        if end is None:
+            end = time
+        elif end < time:
+            raise ValueError("Events must not end before they start")
+        self.times.append(time)
+        self.ends.append(end)
+        self.interval_count += end > time
+        self.type_codes.append(self.types.code(type))
+        self.label_codes.append(self.labels.code(label))
+        self.descriptions.append(description)
+        self.ids.append(id)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def event(self, i: int) -> dict:
+        """Materializes one event in the TimelineEvent shape."""
+        return {
+            "id": self.ids[i],
+            "time": self.times[i],
+            "end": self.ends[i],
+            "label": self.labels[self.label_codes[i]],
+            "type": self.types[self.type_codes[i]],
+            "description": self.descriptions[i],
+        }
+
+    def type_code(self, type: str) -> int | None:
+        """Returns the code of an event type, None if no event has it."""
+        return self.types.codes.get(type)
+
+    def window(self, start: float, end: float) -> range:
+        """Returns the indexes of the events between start and end."""
+        return range(bisect_left(self.times, start), bisect_right(self.times, end))
+
+    def to_columns(self) -> dict:
+        """Returns the columns as bytes and the string tables as JSON, for storage."""
+        return {
+            "times": self.times.tobytes(),
+            "ends": self.ends.tobytes(),
+            "type_codes": self.type_codes.tobytes(),
+            "label_codes": self.label_codes.tobytes(),
+            "id_data": bytes(self.ids.data),
+            "id_ends": self.ids.ends.tobytes(),
+            "description_data": bytes(self.descriptions.data),
+            "description_ends": self.descriptions.ends.tobytes(),
+            "strings": json.dumps([self.types.values, self.labels.values]),
+        }
+
+    @classmethod
+    def from_columns(cls, columns: dict) -> "EventStore":
+        """Rebuilds a store from `to_columns` output without touching each event."""
+        store = cls()
+        store.times.frombytes(columns["times"])
+        store.ends.frombytes(columns["ends"])
+        store.interval_count = sum(map(operator.gt, store.ends, store.times))
+        store.type_codes.frombytes(columns["type_codes"])
+        store.label_codes.frombytes(columns["label_codes"])
+        store.ids.data = bytearray(columns["id_data"])
+        store.ids.ends.frombytes(columns["id_ends"])
+        store.descriptions.data = bytearray(columns["description_data"])
+        store.descriptions.ends.frombytes(columns["description_ends"])
+        types, labels = json.loads(columns["strings"])
+        store.types = StringTable(types)
+        store.labels = StringTable(labels)
+        return store
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns and string tables."""
+        columns = (
+            self.times,
+            self.ends,
+            self.type_codes,
+            self.label_codes,
+            self.ids.ends,
+            self.descriptions.ends,
+        )
+        tables = (self.types, self.labels)
+        return (
+            sum(column.buffer_info()[1] * column.itemsize for column in columns)
+            + len(self.ids.data)
+            + len(self.descriptions.data)
+            + sum(sys.getsizeof(value) for t in tables for value in t.values)
+        )
\ No newline at end of file
@@ -0,0 +1,233 @@
+import csv
+import heapq
+import io
+import itertools
+import json
+import logging
+import math
+import os
+import pickle
+import tempfile
+import time
+from typing import Iterable, Iterator
+
+from app.engine.clock import format_time
+from app.engine.event_store import EventStore
+
+TIMELINE_TYPES = ("conflict_id", "proposal_fkey")
+REQUIRED_FIELDS = ("timeline_id", "timeline_type", "time", "label", "type")
+CHUNK_ROWS = 100_000
+RUN_BATCH_ROWS = 4096
+READ_BUFFER = 1 << 20
+MAX_REPORTED_ERRORS = 20
+
+# Sort key first: timeline id, event time, then file order for stable ties.
+_TIMELINE_ID, _TIME, _SEQ, _TIMELINE_TYPE, _NAME, _ID, _LABEL, _TYPE, _DESC, _END = (
+    range(10)
+)
+
+
+class ImportRowError(ValueError):
+    """A row of an import file that cannot be turned into an event."""
+
+
+class ImportStats:
+    """Counters of one import run, including its throughput."""
+
+    def __init__(self):
+        self.rows = 0
+        self.rejected = 0
+        self.timelines = 0
+        self.events = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self.errors: list[str] = []
+
+    def reject(self, reason: str, line: int | None = None):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(reason if line is None else f"line {line}: {reason}")
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Imported {self.events} events into {self.timelines} timelines "
+            f"from {self.rows} rows ({self.rejected} rejected) "
+            f"in {self.seconds:.2f}s, {self.rows_per_second:,.0f} rows/s"
+        )
+
+
+def read_rows(path: str) -> Iterator[tuple[int, dict]]:
+    """Streams (line number, raw row) pairs from a JSONL or CSV file."""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, "rb", buffering=READ_BUFFER) as raw:
+        text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        if extension == ".csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row
+        elif extension in (".jsonl", ".ndjson"):
+            for line_no, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, {"_error": f"invalid JSON: {e.msg}"}
+        else:
+            raise ValueError(f"Unsupported import file type: {extension or path}")
+
+
+def parse_row(seq: int, row: dict) -> tuple:
+    """Validates a raw row and returns it as a compact, sortable tuple."""
+    if not isinstance(row, dict):
+        raise ImportRowError("row is not an object")
+    if "_error" in row:
+        raise ImportRowError(row["_error"])
+    missing = [field for field in REQUIRED_FIELDS if row.get(field) in (None, "")]
+    if missing:
+        raise ImportRowError(f"missing {', '.join(missing)}")
+    if row["timeline_type"] not in TIMELINE_TYPES:
+        raise ImportRowError(f"unknown timeline type {row['timeline_type']!r}")
+    try:
+        event_time = float(row["time"])
+    except (TypeError, ValueError):
+        raise ImportRowError(f"invalid time {row['time']!r}") from None
+    if not math.isfinite(event_time) or event_time < 0:
+        raise ImportRowError(f"invalid time {row['time']!r}")
+    end_time = None
+    if row.get("end") not in (None, ""):
+        try:
+            end_time = float(row["end"])
+        except (TypeError, ValueError):
+            raise ImportRowError(f"invalid end {row['end']!r}") from None
+        if not math.isfinite(end_time) or end_time < event_time:
+            raise ImportRowError(f"invalid end {row['end']!r}")
+    timeline_id = str(row["timeline_id"])
+    return (
+        timeline_id,
+        event_time,
+        seq,
+        row["timeline_type"],
+        str(row.get("timeline_name") or timeline_id),
+        str(row.get("id") or ""),
+        str(row["label"]),
+        str(row["type"]),
+        str(row.get("description") or ""),
+        end_time,
+    )
+
+
+def _write_run(rows: list[tuple], directory: str) -> str:
+    rows.sort()
+    path = os.path.join(directory, f"run-{len(os.listdir(directory))}.pickle")
+    with open(path, "wb") as run:
+        for start in range(0, len(rows), RUN_BATCH_ROWS):
+            batch = rows[start : start + RUN_BATCH_ROWS]
+            pickle.dump(batch, run, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: str) -> Iterator[tuple]:
+    with open(path, "rb", buffering=READ_BUFFER) as run:
+        while True:
+            try:
+                yield from pickle.load(run)
+            except EOFError:
+                return
+
+
+def sorted_rows(
+    rows: Iterable[tuple], directory: str, chunk_rows: int = CHUNK_ROWS
+) -> Iterator[tuple]:
+    """Sorts rows by timeline and time, holding at most chunk_rows in memory.
+
+    Full chunks are sorted and written to `directory` as runs, which are
+    then merged lazily.
+    """
+    runs = []
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            runs.append(_write_run(chunk, directory))
+            chunk = []
+    chunk.sort()
+    if not runs:
+        yield from chunk
+        return
+    yield from heapq.merge(*(_read_run(run) for run in runs), iter(chunk))
+
+
+def _build_timeline(rows: Iterator[tuple], stats: ImportStats) -> dict:
+    """Streams one timeline's sorted rows into its EventStore.
+
+    Rows of another timeline type than the first row's are rejected.
+    """
+    first = next(rows)
+    events = EventStore()
+    for row in itertools.chain((first,), rows):
+        if row[_TIMELINE_TYPE] != first[_TIMELINE_TYPE]:
+            stats.reject(f"timeline {first[_TIMELINE_ID]} mixes types")
+            continue
+        events.append(
+            row[_ID] or f"{row[_TIMELINE_ID]}-{len(events)}",
+            row[_TIME],
+            row[_LABEL],
+            row[_TYPE],
+            row[_DESC],
+            row[_END],
+        )
+    duration = float(math.ceil(max(events.ends))) or 1.0
+    return {
+        "id": first[_TIMELINE_ID],
+        "name": first[_NAME],
+        "type": first[_TIMELINE_TYPE],
+        "duration": duration,
+        "formatted_duration": format_time(duration),
+        "events": events,
+    }
+
+
+def import_timelines(
+    path: str,
+    stats: ImportStats | None = None,
+    strict: bool = False,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[dict]:
+    """Streams timelines out of a JSONL or CSV file of events.
+
+    Each row is one event: timeline_id, timeline_type, time, label, type and
+    optionally description, id, timeline_name and end, which makes it an
+    interval event. Timelines are yielded one at a time with their events
+    sorted by time and their duration rounded up from the last end. Invalid
+    rows are skipped and counted in `stats`, or raise ImportRowError when
+    `strict` is set.
+    """
+    stats = stats if stats is not None else ImportStats()
+
+    def valid_rows() -> Iterator[tuple]:
+        for seq, (line_no, raw) in enumerate(read_rows(path)):
+            stats.rows += 1
+            try:
+                yield parse_row(seq, raw)
+            except ImportRowError as e:
+                if strict:
+                    raise ImportRowError(f"line {line_no}: {e}") from None
+                stats.reject(str(e), line_no)
+
+    with tempfile.TemporaryDirectory(prefix="timeline-import-") as directory:
+        rows = sorted_rows(valid_rows(), directory, chunk_rows)
+        for _, group in itertools.groupby(rows, key=lambda row: row[_TIMELINE_ID]):
+            timeline = _build_timeline(group, stats)
+            stats.timelines += 1
+            stats.events += len(timeline["events"])
+            yield timeline
+    stats.finish()
+    logging.info(f"[Import] {path}: {stats.summary()}")
\ No newline at end of file
@@ -0,0 +1,97 @@
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from app.engine.event_store import EventStore
+
+DOT_LIMIT = int(os.environ.get("TIMELINE_LOD_DOT_LIMIT", "200"))
+BIN_COUNT = int(os.environ.get("TIMELINE_LOD_BIN_COUNT", "160"))
+MIN_VIEW_SECONDS = 1.0
+BINNED_TYPES = ("conflict", "proposal")
+
+
+class EventBinner:
+    """Aggregates a timeline's sorted events over arbitrary time windows.
+
+    Prefix counts per event type are built once, so counting the events of
+    any time range is two bisects and a subtraction, and binning a window
+    costs O(bins * log n) however many events it holds.
+    """
+
+    def __init__(self, store: EventStore):
+        self.times = store.times
+        self._cached_window: tuple[float, float, int] | None = None
+        self._cached_bins: list[dict] = []
+        self.prefix = {}
+        for event_type in BINNED_TYPES:
+            code = store.type_code(event_type)
+            self.prefix[event_type] = array(
+                "I", [0, *accumulate(c == code for c in store.type_codes)]
+            )
+
+    def window(self, start: float, end: float) -> range:
+        """Returns the indexes of the events between start and end."""
+        return range(bisect_left(self.times, start), bisect_right(self.times, end))
+
+    def bins(self, start: float, end: float, bin_count: int = BIN_COUNT) -> list[dict]:
+        """Buckets the window into equal time bins, skipping empty ones.
+
+        Positions are percentages of the window; `first` and `count` let the
+        browser derive each bin's triggered share from the timeline's cursor.
+        The bins of the last window asked for are kept, since a card asks
+        again for every change of its action statuses.
+        """
+        if self._cached_window == (start, end, bin_count):
+            return self._cached_bins
+        span = end - start
+        if span <= 0:
+            return []
+        width = span / bin_count
+        bins = []
+        lo = bisect_left(self.times, start)
+        for n in range(bin_count):
+            bin_end = end if n == bin_count - 1 else start + (n + 1) * width
+            hi = bisect_right(self.times, bin_end, lo)
+            if hi > lo:
+                bins.append(
+                    {
+                        "first": lo,
+                        "count": hi - lo,
+                        "start": start + n * width,
+                        "end": bin_end,
+                        "left": n * 100 / bin_count,
+                        "width": 100 / bin_count,
+                        "weight": 0.0,
+                        "conflicts": self.prefix["conflict"][hi]
+                        - self.prefix["conflict"][lo],
+                        "proposals": self.prefix["proposal"][hi]
+                        - self.prefix["proposal"][lo],
+                    }
+                )
+            lo = hi
+        densest = max((b["count"] for b in bins), default=0)
+        for b in bins:
+            b["weight"] = b["count"] / densest
+        self._cached_window = (start, end, bin_count)
+        self._cached_bins = bins
+        return bins
+
+
+def bin_statuses(bins: list[dict], statuses: dict[str, str]) -> dict[str, dict]:
+    """Counts the unfinished actions of each bin.
+
+    `statuses` holds the actions still in flight ("triggered") or failed,
+    keyed by event index. Only bins with any are returned, keyed by their
+    `first` event index as a string.
+    """
+    firsts = [b["first"] for b in bins]
+    split: dict[str, dict] = {}
+    for key, status in statuses.items():
+        index = int(key)
+        position = bisect_right(firsts, index) - 1
+        if position < 0 or index >= firsts[position] + bins[position]["count"]:
+            continue
+        counts = split.setdefault(str(firsts[position]), {"active": 0, "failed": 0})
+        counts["failed" if status == "failed" else "active"] += 1
+    return split
\ No newline at end of file
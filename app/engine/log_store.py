@@ -0,0 +1,151 @@
+import itertools
+import json
+import os
+from array import array
+from collections import deque
+
+from app.engine.clock import format_time
+
+DEFAULT_CAPACITY = int(os.environ.get("TIMELINE_LOG_CAPACITY", "500"))
+SPILL_DIR = os.environ.get("TIMELINE_LOG_SPILL_DIR")
+
+
+def log_row(position: float, event_label: str, action: str) -> dict:
+    """Builds a log row as the event-details panel shows it."""
+    return {
+        "timestamp": format_time(position),
+        "event_label": event_label,
+        "action": action,
+    }
+
+
+class EventLogStore:
+    """Log rows of one timeline: the newest in a ring buffer, the rest on disk.
+
+    Appending is O(1) and memory stays bounded by `capacity`. When a
+    `spill_path` is set, rows pushed out of the ring buffer are appended to
+    that file as JSON lines, so older pages can still be read back; without
+    one they are dropped. Rows are addressed newest first, like the panel
+    shows them. Each row keeps the time of the event it is about, so a seek
+    back can roll back the rows of the events it rewinds.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, spill_path: str | None = None):
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.rows: deque[dict] = deque(maxlen=capacity)
+        self.positions: deque[float] = deque(maxlen=capacity)
+        self.total = 0
+        self.dropped = 0
+        self.latest = 0.0
+        self._spill_offsets = array("Q")
+        self._spill_positions = array("d")
+        self._spill_file = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_spill_file"] = None
+        return state
+
+    def append(self, row: dict, position: float = 0.0):
+        if len(self.rows) == self.capacity:
+            self._evict(self.rows[0], self.positions[0])
+        self.rows.append(row)
+        self.positions.append(position)
+        self.total += 1
+        self.latest = max(self.latest, position)
+
+    def _evict(self, row: dict, position: float):
+        if self.spill_path is None:
+            self.dropped += 1
+            return
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, "ab")
+        self._spill_offsets.append(self._spill_file.tell())
+        self._spill_positions.append(position)
+        self._spill_file.write(json.dumps(row).encode() + b"\n")
+
+    @property
+    def available(self) -> int:
+        """Number of rows that can still be read back."""
+        return self.total - self.dropped
+
+    def page(self, offset: int, limit: int) -> list[dict]:
+        """Returns up to `limit` rows, skipping the `offset` newest ones."""
+        stop = min(offset + limit, self.available)
+        memory_rows = len(self.rows)
+        page = [
+            self.rows[memory_rows - 1 - position]
+            for position in range(offset, min(stop, memory_rows))
+        ]
+        spilled = range(max(offset, memory_rows) - memory_rows, stop - memory_rows)
+        if spilled:
+            page.extend(self._read_spilled(spilled))
+        return page
+
+    def _read_spilled(self, positions: range) -> list[dict]:
+        """Reads spilled rows, counting back from the most recently spilled."""
+        if self._spill_file is not None:
+            self._spill_file.flush()
+        last = len(self._spill_offsets) - 1
+        with open(self.spill_path, "rb") as spill:
+            rows = []
+            for position in positions:
+                spill.seek(self._spill_offsets[last - position])
+                rows.append(json.loads(spill.readline()))
+            return rows
+
+    def restore(self, total: int, rows: list[tuple[float, dict]]):
+        """Fills an empty store with the newest rows of a saved log.
+
+        `rows` are (position, row) pairs, oldest first, out of `total` rows;
+        the older ones count as dropped.
+        """
+        for position, row in rows:
+            self.append(row, position)
+        self.total = total
+        self.dropped = total - len(self.rows)
+
+    def rollback(self, position: float) -> int:
+        """Drops the rows of events after `position`, returning how many.
+
+        Rows are not logged in event-time order (action results come late),
+        so every row is checked, unless none is after `position`. Spilled
+        rows are forgotten like on clear; rows dropped for lack of a spill
+        file are already gone.
+        """
+        if self.latest <= position:
+            return 0
+        kept = [(p, row) for p, row in zip(self.positions, self.rows) if p <= position]
+        spilled = [
+            (p, offset)
+            for p, offset in zip(self._spill_positions, self._spill_offsets)
+            if p <= position
+        ]
+        removed = len(self.rows) - len(kept) + len(self._spill_positions) - len(spilled)
+        self.positions = deque((p for p, _ in kept), maxlen=self.capacity)
+        self.rows = deque((row for _, row in kept), maxlen=self.capacity)
+        self._spill_positions = array("d", (p for p, _ in spilled))
+        self._spill_offsets = array("Q", (offset for _, offset in spilled))
+        self.latest = max((p for p, _ in itertools.chain(kept, spilled)), default=0.0)
+        self.total -= removed
+        return removed
+
+    def delete_spill(self):
+        """Deletes the spill file, when the store is dropped or cleared."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        if self.spill_path is not None and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+
+    def clear(self):
+        """Forgets all rows and deletes the spill file."""
+        self.delete_spill()
+        self.rows.clear()
+        self.positions.clear()
+        self.total = 0
+        self.dropped = 0
+        self.latest = 0.0
+        self._spill_offsets = array("Q")
+        self._spill_positions = array("d")
\ No newline at end of file
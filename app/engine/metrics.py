@@ -0,0 +1,189 @@
+import json
+import os
+import time
+from bisect import bisect_left
+
+from app.engine.actions import ActionDispatcher
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+DRIFT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+EVENT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+# Serializing a delta only to measure it costs about as much as sending it,
+# so only one tick in this many is measured unless the profiler is on.
+DELTA_SAMPLE_EVERY = int(os.environ.get("TIMELINE_METRICS_DELTA_SAMPLE", "16"))
+PROFILE_PATH = os.environ.get("TIMELINE_PROFILE_PATH")
+
+
+class Histogram:
+    """Prometheus-style histogram with fixed upper bounds."""
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class PlaybackMetrics:
+    """Counters and histograms of the playback loops of this backend process.
+
+    Recording a tick is a few additions, so it is always on; only the state
+    delta is sampled, see DELTA_SAMPLE_EVERY.
+    """
+
+    def __init__(self):
+        self.ticks = 0
+        self.events_fired = 0
+        self.actions_triggered = 0
+        self.tick_seconds = Histogram(
+            "timeline_tick_seconds",
+            "Time a playback tick held the state lock.",
+            SECONDS_BUCKETS,
+        )
+        self.tick_drift_seconds = Histogram(
+            "timeline_tick_drift_seconds",
+            "How much later than scheduled a playback tick ran, in wall time.",
+            DRIFT_BUCKETS,
+        )
+        self.tick_events = Histogram(
+            "timeline_tick_events",
+            "Events fired by one playback tick.",
+            EVENT_BUCKETS,
+        )
+        self.submit_seconds = Histogram(
+            "timeline_action_submit_seconds",
+            "Time a playback loop waited to queue the actions of a tick.",
+            SECONDS_BUCKETS,
+        )
+        self.delta_bytes = Histogram(
+            "timeline_delta_bytes",
+            "Serialized size of the state delta of a sampled tick.",
+            BYTE_BUCKETS,
+        )
+        self.delta_seconds = Histogram(
+            "timeline_delta_serialize_seconds",
+            "Time to serialize the state delta of a sampled tick.",
+            SECONDS_BUCKETS,
+        )
+
+    def sample_delta(self) -> bool:
+        """Whether the tick being recorded should measure its state delta."""
+        return tick_profiler is not None or self.ticks % DELTA_SAMPLE_EVERY == 0
+
+    def observe_tick(
+        self,
+        seconds: float,
+        drift: float,
+        events: int,
+        submit_seconds: float,
+        delta_bytes: int | None = None,
+        delta_seconds: float | None = None,
+    ):
+        self.ticks += 1
+        self.tick_seconds.observe(seconds)
+        self.tick_drift_seconds.observe(drift)
+        self.tick_events.observe(events)
+        self.submit_seconds.observe(submit_seconds)
+        if delta_bytes is not None:
+            self.delta_bytes.observe(delta_bytes)
+            self.delta_seconds.observe(delta_seconds)
+
+    def render(self, dispatcher: ActionDispatcher) -> str:
+        """Returns the metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, help, value in (
+            ("timeline_ticks_total", "Playback ticks run.", self.ticks),
+            ("timeline_events_fired_total", "Events fired.", self.events_fired),
+            (
+                "timeline_actions_triggered_total",
+                "Fired events that had a backend action.",
+                self.actions_triggered,
+            ),
+        ):
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} counter"]
+            lines.append(f"{name} {value}")
+        for histogram in (
+            self.tick_seconds,
+            self.tick_drift_seconds,
+            self.tick_events,
+            self.submit_seconds,
+            self.delta_bytes,
+            self.delta_seconds,
+        ):
+            lines += histogram.render()
+        lines += _render_dispatcher(dispatcher.stats())
+        return "\n".join(lines) + "\n"
+
+
+def _render_dispatcher(stats: dict) -> list[str]:
+    lines = []
+    for name, help, kind in (
+        ("queued", "Actions waiting for a worker.", "gauge"),
+        ("in_flight", "Actions running.", "gauge"),
+        ("submitted", "Actions queued since start.", "counter"),
+        ("blocked_submits", "Submits that waited for a full queue.", "counter"),
+    ):
+        metric = f"timeline_actions_{name}"
+        lines += [f"# HELP {metric} {help}", f"# TYPE {metric} {kind}"]
+        lines.append(f"{metric} {stats[name]}")
+    metric = "timeline_action_handler_seconds"
+    lines += [
+        f"# HELP {metric} Latency of action handlers over their recent calls.",
+        f"# TYPE {metric} summary",
+    ]
+    for handler, handler_stats in stats["handlers"].items():
+        label = f'handler="{handler}"'
+        for quantile, key in (("0.5", "p50_seconds"), ("0.95", "p95_seconds")):
+            lines.append(
+                f'{metric}{{{label},quantile="{quantile}"}} {handler_stats[key]}'
+            )
+        lines.append(
+            f"{metric}_sum{{{label}}} "
+            f"{handler_stats['mean_seconds'] * handler_stats['calls']}"
+        )
+        lines.append(f"{metric}_count{{{label}}} {handler_stats['calls']}")
+    metric = "timeline_action_handler_failures_total"
+    lines += [
+        f"# HELP {metric} Action handler calls that raised.",
+        f"# TYPE {metric} counter",
+    ]
+    for handler, handler_stats in stats["handlers"].items():
+        lines.append(f'{metric}{{handler="{handler}"}} {handler_stats["failures"]}')
+    return lines
+
+
+class TickProfiler:
+    """Appends one JSON line per playback tick to a file.
+
+    Enabled by setting TIMELINE_PROFILE_PATH; when it is unset there is no
+    profiler and the playback loop skips it with a single check.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", buffering=1)
+
+    def record(self, **fields):
+        self._file.write(json.dumps({"wall_time": time.time(), **fields}) + "\n")
+
+
+playback_metrics = PlaybackMetrics()
+tick_profiler = TickProfiler(PROFILE_PATH) if PROFILE_PATH else None
\ No newline at end of file
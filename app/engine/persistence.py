@@ -0,0 +1,331 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from typing import Callable
+
+from app.engine.event_store import EventStore
+
+DB_PATH = os.environ.get("TIMELINE_DB_PATH")
+# Most writes one transaction of the writer thread commits.
+BATCH_WRITES = 2000
+# Wall-clock seconds between checkpoints of the action statuses while
+# playing; the playhead itself is saved whenever a tick fires.
+CHECKPOINT_SECONDS = float(os.environ.get("TIMELINE_CHECKPOINT_SECONDS", "5"))
+
+# Bumped when the tables change; sessions saved in an older layout are
+# dropped rather than resumed wrongly.
+SCHEMA_VERSION = 2
+TABLES = ("timelines", "events", "transitions", "logs", "checkpoints")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS timelines (
+    session TEXT, id TEXT, ord INTEGER, name TEXT, type TEXT,
+    duration REAL, event_count INTEGER, PRIMARY KEY (session, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    session TEXT, timeline_id TEXT, times BLOB, ends BLOB, type_codes BLOB,
+    label_codes BLOB, id_data BLOB, id_ends BLOB, description_data BLOB,
+    description_ends BLOB, strings TEXT, PRIMARY KEY (session, timeline_id)
+);
+CREATE TABLE IF NOT EXISTS transitions (
+    session TEXT, timeline_id TEXT, event_key TEXT, status TEXT
+);
+CREATE INDEX IF NOT EXISTS transitions_session ON transitions (session);
+CREATE TABLE IF NOT EXISTS logs (
+    session TEXT, timeline_id TEXT, position REAL, row TEXT
+);
+CREATE INDEX IF NOT EXISTS logs_timeline ON logs (session, timeline_id);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    session TEXT PRIMARY KEY, position REAL, rate REAL, seek_mode TEXT,
+    statuses TEXT
+);
+"""
+_EVENT_COLUMNS = (
+    "times",
+    "ends",
+    "type_codes",
+    "label_codes",
+    "id_data",
+    "id_ends",
+    "description_data",
+    "description_ends",
+    "strings",
+)
+
+
+class SessionStore:
+    """Playback sessions persisted to SQLite, keyed by client or session token.
+
+    Timeline definitions are written once, their events as column blobs.
+    Status transitions and log rows are appended as they happen, the
+    playhead is saved after every tick that logged something, and the
+    action statuses are checkpointed from time to time, which compacts the
+    transitions. Writers only enqueue; one background thread
+    applies the queue in batched transactions, so the tick path never waits
+    on the disk. Reads run on the caller's thread with a connection of its
+    own.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: queue.Queue = queue.Queue()
+        self._readers = threading.local()
+        with self._connect() as connection:
+            (version,) = connection.execute("PRAGMA user_version").fetchone()
+            if version != SCHEMA_VERSION:
+                if connection.execute("SELECT 1 FROM sqlite_master").fetchone():
+                    logging.warning(
+                        f"Dropping sessions saved in {path} by an older version"
+                    )
+                for table in TABLES:
+                    connection.execute(f"DROP TABLE IF EXISTS {table}")
+            connection.executescript(SCHEMA)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._writer = threading.Thread(
+            target=self._write_loop, name="timeline-persistence", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _write(self, sql: str, params: tuple | Callable[[], tuple] = ()):
+        """Queues a statement; callable params are built in the writer thread."""
+        self._queue.put((sql, params))
+
+    def _write_loop(self):
+        connection = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < BATCH_WRITES:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with connection:
+                    for write in batch:
+                        if write is None:
+                            continue
+                        sql, params = write
+                        if callable(params):
+                            params = params()
+                        connection.execute(sql, params)
+            except sqlite3.Error:
+                logging.exception(f"Could not persist {len(batch)} writes")
+            for write in batch:
+                self._queue.task_done()
+            if None in batch:
+                connection.close()
+                return
+
+    def flush(self):
+        """Waits until every queued write is committed."""
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+    def save_timeline(self, session: str, timeline: dict, events: EventStore):
+        """Saves a timeline definition after the session's other timelines."""
+        self._write(
+            "INSERT OR REPLACE INTO timelines VALUES (?, ?, (SELECT COALESCE(MAX(ord), "
+            "-1) + 1 FROM timelines WHERE session = ?), ?, ?, ?, ?)",
+            (
+                session,
+                timeline["id"],
+                session,
+                timeline["name"],
+                timeline["type"],
+                timeline["duration"],
+                len(events),
+            ),
+        )
+
+        def columns() -> tuple:
+            # Packed in the writer thread; the store is not changed once added.
+            packed = events.to_columns()
+            return (session, timeline["id"], *(packed[c] for c in _EVENT_COLUMNS))
+
+        self._write(
+            "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            columns,
+        )
+
+    def delete_timeline(self, session: str, timeline_id: str):
+        for table, column in (
+            ("timelines", "id"),
+            ("events", "timeline_id"),
+            ("transitions", "timeline_id"),
+            ("logs", "timeline_id"),
+        ):
+            self._write(
+                f"DELETE FROM {table} WHERE session = ? AND {column} = ?",
+                (session, timeline_id),
+            )
+
+    def delete_session(self, session: str):
+        for table in TABLES:
+            self._write(f"DELETE FROM {table} WHERE session = ?", (session,))
+
+    def set_status(self, session: str, timeline_id: str, key: str, status: str | None):
+        self._write(
+            "INSERT INTO transitions VALUES (?, ?, ?, ?)",
+            (session, timeline_id, key, status),
+        )
+
+    def add_log(self, session: str, timeline_id: str, position: float, row: dict):
+        self._write(
+            "INSERT INTO logs VALUES (?, ?, ?, ?)",
+            lambda: (session, timeline_id, position, json.dumps(row)),
+        )
+
+    def rollback_logs(self, session: str, timeline_id: str, position: float):
+        """Deletes a timeline's log rows of events after `position`."""
+        self._write(
+            "DELETE FROM logs WHERE session = ? AND timeline_id = ? AND position > ?",
+            (session, timeline_id, position),
+        )
+
+    def clear_progress(self, session: str):
+        """Forgets the logs and statuses of a session, as a stop does."""
+        self._write("DELETE FROM logs WHERE session = ?", (session,))
+        self._write("DELETE FROM transitions WHERE session = ?", (session,))
+        self._write(
+            "UPDATE checkpoints SET statuses = '{}' WHERE session = ?", (session,)
+        )
+
+    def checkpoint(
+        self,
+        session: str,
+        position: float,
+        rate: float,
+        seek_mode: str,
+        statuses: dict[str, dict[str, str]],
+    ):
+        """Records the playhead and statuses, superseding earlier transitions."""
+        self._write(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?)",
+            lambda: (session, position, rate, seek_mode, json.dumps(statuses)),
+        )
+        self._write("DELETE FROM transitions WHERE session = ?", (session,))
+
+    def save_position(self, session: str, position: float):
+        """Moves the checkpoint's playhead past the log rows written before it.
+
+        Queued after those rows, so a resumed session never fires and logs
+        them again.
+        """
+        self._write(
+            "UPDATE checkpoints SET position = ? WHERE session = ?",
+            (position, session),
+        )
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._readers, "connection", None)
+        if connection is None:
+            connection = self._readers.connection = self._connect()
+        return connection
+
+    def load_session(self, session: str) -> dict | None:
+        """Returns a session's timelines, without events, and its latest state.
+
+        Action statuses are the checkpoint's with later transitions applied.
+        Returns None when nothing was saved for the session.
+        """
+        self.flush()
+        reader = self._reader()
+        timelines = [
+            {
+                "id": timeline_id,
+                "name": name,
+                "type": timeline_type,
+                "duration": duration,
+                "event_count": event_count,
+            }
+            for timeline_id, name, timeline_type, duration, event_count in reader.execute(
+                "SELECT id, name, type, duration, event_count FROM timelines "
+                "WHERE session = ? ORDER BY ord",
+                (session,),
+            )
+        ]
+        checkpoint = reader.execute(
+            "SELECT position, rate, seek_mode, statuses FROM checkpoints "
+            "WHERE session = ?",
+            (session,),
+        ).fetchone()
+        if not timelines and checkpoint is None:
+            return None
+        position, rate, seek_mode, statuses = checkpoint or (0.0, 1.0, "skip", "{}")
+        statuses = json.loads(statuses)
+        for timeline_id, key, status in reader.execute(
+            "SELECT timeline_id, event_key, status FROM transitions "
+            "WHERE session = ? ORDER BY rowid",
+            (session,),
+        ):
+            if status is None:
+                statuses.get(timeline_id, {}).pop(key, None)
+            else:
+                statuses.setdefault(timeline_id, {})[key] = status
+        return {
+            "timelines": timelines,
+            "position": position,
+            "rate": rate,
+            "seek_mode": seek_mode,
+            "statuses": statuses,
+        }
+
+    def load_events(self, session: str, timeline_id: str) -> EventStore:
+        row = (
+            self._reader()
+            .execute(
+                f"SELECT {', '.join(_EVENT_COLUMNS)} FROM events "
+                "WHERE session = ? AND timeline_id = ?",
+                (session, timeline_id),
+            )
+            .fetchone()
+        )
+        if row is None:
+            raise KeyError(timeline_id)
+        return EventStore.from_columns(dict(zip(_EVENT_COLUMNS, row)))
+
+    def load_logs(
+        self, session: str, timeline_id: str, limit: int
+    ) -> tuple[int, list[tuple[float, dict]]]:
+        """Returns a timeline's log row count and its newest rows, oldest first."""
+        reader = self._reader()
+        (total,) = reader.execute(
+            "SELECT COUNT(*) FROM logs WHERE session = ? AND timeline_id = ?",
+            (session, timeline_id),
+        ).fetchone()
+        rows = reader.execute(
+            "SELECT position, row FROM logs WHERE session = ? AND timeline_id = ? "
+            "ORDER BY rowid DESC LIMIT ?",
+            (session, timeline_id, limit),
+        ).fetchall()
+        return total, [(position, json.loads(row)) for position, row in reversed(rows)]
+
+
+class LazyEvents(dict):
+    """Event stores by timeline id, loaded from the session store on first use."""
+
+    def __init__(self, session: str):
+        super().__init__()
+        self.session = session
+
+    def __missing__(self, timeline_id: str) -> EventStore:
+        events = session_store.load_events(self.session, timeline_id)
+        self[timeline_id] = events
+        return events
+
+
+session_store = SessionStore(DB_PATH) if DB_PATH else None
\ No newline at end of file
@@ -0,0 +1,392 @@
+import argparse
+import asyncio
+import heapq
+import json
+import logging
+import os
+import sys
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator
+
+from app.engine.actions import (
+    ActionDispatcher,
+    ActionJob,
+    ActionResult,
+    action_dispatcher,
+    describe_action,
+    describe_exit,
+)
+from app.engine.clock import PlaybackClock, format_time
+from app.engine.event_index import EventIndex, IntervalIndex, firing_order
+from app.engine.importer import import_timelines
+from app.engine.log_store import log_row
+
+# How many events to fire between yields to the action workers when
+# replaying as fast as possible.
+YIELD_EVERY = 1000
+
+LogSink = Callable[[str, dict], None]
+
+
+class ReplayStats:
+    """Counters of one replay run."""
+
+    def __init__(self):
+        self.events = 0
+        self.exits = 0
+        self.actions = 0
+        self.failed_actions = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self.timeline_seconds = 0.0
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self.started
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Replayed {self.events} events and {self.exits} ends "
+            f"({format_time(self.timeline_seconds)} of timeline) with "
+            f"{self.actions} actions, {self.failed_actions} "
+            f"failed, in {self.seconds:.2f}s, {self.events_per_second:,.0f} events/s"
+        )
+
+
+def interval_index(timeline: dict) -> IntervalIndex | None:
+    """Returns the interval index of a timeline with interval events."""
+    events = timeline["events"]
+    if not events.interval_count:
+        return None
+    return IntervalIndex(events.times, events.ends)
+
+
+def merged_events(
+    timelines: list[dict], intervals: list[IntervalIndex | None]
+) -> Iterator[tuple[float, int, str, int]]:
+    """Yields (time, timeline position, transition, event index) in firing order.
+
+    Each timeline is in `firing_order`, as a playback tick fires it; ties
+    between timelines go to the earlier one.
+    """
+    return heapq.merge(
+        *(
+            _timeline_fired(position, timeline, intervals[position])
+            for position, timeline in enumerate(timelines)
+        )
+    )
+
+
+def _timeline_fired(
+    position: int, timeline: dict, intervals: IntervalIndex | None
+) -> Iterator[tuple[float, int, str, int]]:
+    events = timeline["events"]
+    entered = range(bisect_right(events.times, timeline["duration"]))
+    ended = []
+    if intervals is not None:
+        ended = (
+            i
+            for i in intervals.end_order[
+                : bisect_right(intervals.exits.times, timeline["duration"])
+            ]
+            if intervals.ends[i] > intervals.times[i]
+        )
+    for time_, transition, i in firing_order(events.times, events.ends, entered, ended):
+        yield time_, position, transition, i
+
+
+class ReplayEngine:
+    """Replays timelines without the UI, as fast as possible or paced.
+
+    Events fire in time order through each timeline's EventIndex, exactly as
+    a playback tick would fire them, and produce the same log rows. Interval
+    events also end through the exit cursor of the timeline's IntervalIndex.
+    With a dispatcher, their enter and exit actions run too; failures are
+    logged like the UI logs them.
+    """
+
+    def __init__(
+        self,
+        timelines: list[dict],
+        speed: float | None = None,
+        dispatcher: ActionDispatcher | None = None,
+        on_log: LogSink | None = None,
+    ):
+        self.timelines = timelines
+        self.speed = speed
+        self.dispatcher = dispatcher
+        self.on_log = on_log or (lambda timeline_id, row: None)
+        self.stats = ReplayStats()
+        self.indexes = [EventIndex(timeline["events"].times) for timeline in timelines]
+        self.intervals = [interval_index(timeline) for timeline in timelines]
+
+    def fired(self) -> Iterator[tuple[float, int, str, int]]:
+        """Yields (time, timeline position, transition, event index) as each fires."""
+        for time_, position, transition, _ in merged_events(
+            self.timelines, self.intervals
+        ):
+            if transition == "enter":
+                crossed = self.indexes[position].advance(time_)
+            else:
+                crossed = self.intervals[position].advance_exits(time_)
+            for i in crossed:
+                yield time_, position, transition, i
+
+    async def run(self) -> ReplayStats:
+        clock = PlaybackClock(rate=self.speed or 1.0)
+        clock.play()
+        fired = 0
+        for time_, position, transition, i in self.fired():
+            if self.speed:
+                delay = (time_ - clock.position()) / clock.rate
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif fired % YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+            fired += 1
+            await self._fire(self.timelines[position], i, time_, transition)
+            self.stats.timeline_seconds = time_
+        if self.dispatcher is not None:
+            await self.dispatcher.drain()
+        self.stats.finish()
+        return self.stats
+
+    async def _fire(
+        self, timeline: dict, index: int, time_: float, transition: str = "enter"
+    ):
+        event = timeline["events"].event(index)
+        if transition == "exit":
+            self.stats.exits += 1
+            message = describe_exit(event)
+        else:
+            self.stats.events += 1
+            message = describe_action(event)
+        self.on_log(timeline["id"], log_row(time_, event["label"], message))
+        if self.dispatcher is None:
+            return
+        job = ActionJob(
+            timeline["id"],
+            timeline["type"],
+            index,
+            event,
+            lambda result: self._on_result(result, time_),
+            transition,
+        )
+        if await self.dispatcher.submit(job):
+            self.stats.actions += 1
+
+    async def _on_result(self, result: ActionResult, time_: float):
+        if result.status == "failed":
+            self.stats.failed_actions += 1
+            self.on_log(
+                result.timeline_id,
+                log_row(time_, result.event["label"], result.message),
+            )
+
+
+def encode_row(timeline_id: str, row: dict) -> str:
+    """Returns a log row as the JSON line the CLI writes."""
+    return json.dumps({"timeline_id": timeline_id, **row}) + "\n"
+
+
+def write_jsonl(out) -> LogSink:
+    def sink(timeline_id: str, row: dict):
+        out.write(encode_row(timeline_id, row))
+
+    return sink
+
+
+def partition(timelines: list[dict], shards: int) -> list[list[int]]:
+    """Splits timeline positions into shards of about equal event counts.
+
+    Timelines go, largest first, to the shard with the fewest events so far.
+    Each shard lists its positions in ascending order, so a worker breaks
+    ties at the same time the way the single-process engine does.
+    """
+    loads = [(0, shard) for shard in range(shards)]
+    positions: list[list[int]] = [[] for _ in range(shards)]
+    for position in sorted(
+        range(len(timelines)), key=lambda p: -len(timelines[p]["events"])
+    ):
+        load, shard = heapq.heappop(loads)
+        positions[shard].append(position)
+        heapq.heappush(loads, (load + len(timelines[position]["events"]), shard))
+    return [sorted(shard) for shard in positions if shard]
+
+
+def _replay_shard(
+    shard: list[tuple[int, dict]],
+) -> list[tuple[float, int, str, int, str]]:
+    """Fires one shard's timelines in a worker process.
+
+    Returns (time, global timeline position, transition, event index, JSON
+    line) in firing order, so the parent only has to merge the shards.
+    """
+    positions = [position for position, _ in shard]
+    timelines = [timeline for _, timeline in shard]
+    fired = []
+    for time_, local, transition, i in ReplayEngine(timelines).fired():
+        timeline = timelines[local]
+        event = timeline["events"].event(i)
+        describe = describe_exit if transition == "exit" else describe_action
+        row = log_row(time_, event["label"], describe(event))
+        fired.append(
+            (time_, positions[local], transition, i, encode_row(timeline["id"], row))
+        )
+    return fired
+
+
+class ParallelReplay:
+    """Fast-forward replay with timelines sharded across a process pool.
+
+    Timelines never interact, so each worker fires its shard on its own.
+    The parent merges the shards by (time, timeline position, transition,
+    event index), the order the single-process engine fires in, so the
+    output is identical. Backend actions, if any, run in the parent in that
+    order.
+    """
+
+    def __init__(
+        self,
+        timelines: list[dict],
+        workers: int | None = None,
+        dispatcher: ActionDispatcher | None = None,
+        on_line: Callable[[str], None] | None = None,
+    ):
+        self.timelines = timelines
+        self.workers = workers or os.cpu_count() or 1
+        self.dispatcher = dispatcher
+        self.on_line = on_line or (lambda line: None)
+        self.stats = ReplayStats()
+
+    async def run(self) -> ReplayStats:
+        shards = [
+            [(position, self.timelines[position]) for position in positions]
+            for positions in partition(self.timelines, self.workers)
+        ]
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=len(shards) or 1) as pool:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(pool, _replay_shard, shard) for shard in shards)
+            )
+        for time_, position, transition, i, line in heapq.merge(*results):
+            if transition == "exit":
+                self.stats.exits += 1
+            else:
+                self.stats.events += 1
+            self.stats.timeline_seconds = time_
+            self.on_line(line)
+            if self.dispatcher is not None:
+                await self._dispatch(self.timelines[position], i, time_, transition)
+        if self.dispatcher is not None:
+            await self.dispatcher.drain()
+        self.stats.finish()
+        return self.stats
+
+    async def _dispatch(
+        self, timeline: dict, index: int, time_: float, transition: str
+    ):
+        event = timeline["events"].event(index)
+        job = ActionJob(
+            timeline["id"],
+            timeline["type"],
+            index,
+            event,
+            lambda result: self._on_result(result, time_),
+            transition,
+        )
+        if await self.dispatcher.submit(job):
+            self.stats.actions += 1
+
+    async def _on_result(self, result: ActionResult, time_: float):
+        if result.status == "failed":
+            self.stats.failed_actions += 1
+            row = log_row(time_, result.event["label"], result.message)
+            self.on_line(encode_row(result.timeline_id, row))
+
+
+def replay_file(
+    path: str,
+    speed: float | None = None,
+    run_actions: bool = False,
+    out=None,
+    workers: int = 1,
+) -> ReplayStats:
+    """Imports a JSONL/CSV file and replays all of its timelines.
+
+    Log rows are written to `out` as JSON lines. More than one worker
+    shards the replay across processes, which needs fast-forward mode.
+    """
+    timelines = list(import_timelines(path))
+    dispatcher = action_dispatcher if run_actions else None
+    if workers > 1:
+        if speed:
+            raise ValueError("Parallel replay only runs as fast as possible")
+        engine = ParallelReplay(
+            timelines,
+            workers,
+            dispatcher,
+            on_line=out.write if out is not None else None,
+        )
+    else:
+        engine = ReplayEngine(
+            timelines,
+            speed=speed,
+            dispatcher=dispatcher,
+            on_log=write_jsonl(out) if out is not None else None,
+        )
+    return asyncio.run(engine.run())
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Replay imported timelines without the UI."
+    )
+    parser.add_argument("path", help="JSONL or CSV file of events")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0,
+        help="multiple of real time to replay at; 0 replays as fast as possible",
+    )
+    parser.add_argument(
+        "--actions",
+        action="store_true",
+        help="run the registered backend actions of triggered events",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="processes to shard timelines across in fast-forward mode",
+    )
+    parser.add_argument(
+        "--output", help="file to write log rows to as JSON lines (default stdout)"
+    )
+    args = parser.parse_args(None if argv is None else list(argv))
+    if args.workers > 1 and args.speed:
+        parser.error("--workers needs fast-forward replay (--speed 0)")
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        stats = replay_file(
+            args.path, args.speed or None, args.actions, out, args.workers
+        )
+    except (ValueError, OSError) as e:
+        logging.exception(f"Replay of {args.path} failed: {e}")
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    logging.info(f"[Replay] {stats.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
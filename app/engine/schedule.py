@@ -0,0 +1,69 @@
+import heapq
+from typing import Iterable, NamedTuple
+
+from app.engine.event_index import EventIndex, IntervalIndex
+
+
+class ScheduledTimeline(NamedTuple):
+    timeline: dict
+    index: EventIndex
+    intervals: IntervalIndex | None
+
+    def due_time(self) -> float | None:
+        """Returns when the next event starts or interval event ends, if ever."""
+        due = None
+        candidates = [self.index.next_time()]
+        if self.intervals is not None:
+            candidates.append(self.intervals.exits.next_time())
+        for time_ in candidates:
+            if time_ is not None and time_ <= self.timeline["duration"]:
+                due = time_ if due is None else min(due, time_)
+        return due
+
+
+class PlaybackSchedule:
+    """Timelines in a heap keyed by the time they next have something to fire.
+
+    A tick pops only the timelines that are due and pushes them back with
+    their new due time, so it costs O(due * log timelines) rather than a
+    pass over every timeline, and the time until the next event is the top
+    of the heap. The schedule is rebuilt after the timelines change or their
+    cursors jump; `revision` tells which set of timelines it was built for.
+
+    It is a plain object, so Reflex does not wrap it, nor the timelines and
+    cursors it holds, in change-tracking proxies.
+    """
+
+    def __init__(self):
+        self.revision = -1
+        self._heap: list[tuple[float, int, ScheduledTimeline]] = []
+
+    def rebuild(self, revision: int, entries: Iterable[ScheduledTimeline]):
+        self.revision = revision
+        self._heap = []
+        for order, entry in enumerate(entries):
+            due = entry.due_time()
+            if due is not None:
+                self._heap.append((due, order, entry))
+        heapq.heapify(self._heap)
+
+    def invalidate(self):
+        """Marks the schedule for a rebuild, after cursors moved on their own."""
+        self.revision = -1
+
+    def next_time(self) -> float | None:
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, position: float) -> list[tuple[int, ScheduledTimeline]]:
+        """Removes and returns the timelines due at or before position."""
+        due = []
+        while self._heap and self._heap[0][0] <= position:
+            _, order, entry = heapq.heappop(self._heap)
+            due.append((order, entry))
+        return due
+
+    def push(self, order: int, entry: ScheduledTimeline):
+        """Puts a timeline back after a tick moved its cursors."""
+        due = entry.due_time()
+        if due is not None:
+            heapq.heappush(self._heap, (due, order, entry))
\ No newline at end of file
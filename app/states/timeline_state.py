@@ -1,18 +1,94 @@
 import reflex as rx
 from typing import TypedDict
 import asyncio
+import contextlib
+import copy
+import functools
 import random
 import string
 import logging
+import os
+import shutil
+import time
+import uuid
+from bisect import bisect_right
+from reflex.state import _substate_key
+from reflex.utils import prerequisites
+from reflex.utils.format import json_dumps
+from app.engine.actions import (
+    ActionJob,
+    ActionResult,
+    action_dispatcher,
+    describe_action,
+    describe_exit,
+)
+from app.engine.clock import PlaybackClock, format_time
+from app.engine.event_index import EventIndex, IntervalIndex, firing_order
+from app.engine.event_store import EventStore
+from app.engine.importer import READ_BUFFER, ImportStats, import_timelines
+from app.engine.lod import DOT_LIMIT, MIN_VIEW_SECONDS, EventBinner, bin_statuses
+from app.engine.log_store import SPILL_DIR, EventLogStore, log_row
+from app.engine.metrics import playback_metrics, tick_profiler
+from app.engine.persistence import CHECKPOINT_SECONDS, LazyEvents, session_store
+from app.engine.schedule import PlaybackSchedule, ScheduledTimeline
+
+LOG_PAGE_SIZE = 20
+# Height of a timeline row in pixels, used to map the scroll position to
+# card indexes, and the extra cards rendered around the viewport.
+TIMELINE_ROW_HEIGHT = 380
+TIMELINE_OVERSCAN = 2
+# What a seek does to the events it jumps over: "skip" marks them passed
+# silently, "batch" also fires their actions together and "rollback" also
+# drops the log rows written after the new position.
+SEEK_MODES = ("skip", "batch", "rollback")
+# Tooltip details are fetched when an event is hovered or clicked; the
+# browser keeps the newest few it was sent.
+CLIENT_DETAIL_LIMIT = 32
+# Labels of active interval events shown on a card; the rest are counted.
+ACTIVE_LIST_LIMIT = 3
+# How long action results of one client gather before they are applied
+# together under one state lock.
+RESULT_BATCH_SECONDS = 0.05
+
+# Running playback loops by client token, so pause and stop can cancel them.
+# The generation check in run_playback keeps a loop that cannot be reached
+# from here (another worker) from advancing time after it was superseded.
+_playback_tasks: dict[str, asyncio.Task] = {}
+
+# Fire-and-forget tasks (action submissions, session loops and broadcasts).
+# The event loop only keeps weak references to tasks, so they are held here
+# until they finish.
+_background_tasks: set[asyncio.Task] = set()
+
+# Shared playback sessions: each is hosted by one TimelineState stored under
+# a token of its own, which runs the only clock, trigger loop and actions of
+# the session. Clients that joined are listed here by session name and
+# mirror the host after every change. Like _playback_tasks, this registry is
+# per backend process.
+SESSION_TOKEN_PREFIX = "session-"
+SESSION_COMMANDS = (
+    "_create_timeline",
+    "delete_timeline",
+    "global_toggle_play",
+    "global_stop",
+    "global_seek",
+    "set_playback_rate",
+    "set_seek_mode",
+)
+_session_subscribers: dict[str, set[str]] = {}
+_pending_broadcasts: set[str] = set()
+# Action results waiting to be applied, by client or session token; one
+# task per token applies all of them at once.
+_pending_results: dict[str, list[tuple[int, int, ActionResult]]] = {}
 
 
 class TimelineEvent(TypedDict):
     id: str
     time: float
+    end: float
     label: str
     type: str
     description: str
-    status: str
 
 
 class EventLog(TypedDict):
@@ -21,58 +97,153 @@ class EventLog(TypedDict):
     action: str
 
 
+class PlaybackAnchor(TypedDict):
+    position: float
+    wall_time: float
+    rate: float
+    is_playing: bool
+
+
 class TimelineItem(TypedDict):
     id: str
     name: str
     type: str
     duration: float
-    current_time: float
-    formatted_current_time: str
     formatted_duration: str
-    progress_percent: float
-    is_playing: bool
-    events: list[TimelineEvent]
-    logs: list[EventLog]
+    event_count: int
+
+
+class TimelineView(TypedDict):
+    start: float
+    end: float
+    label: str
+
+
+class EventDot(TypedDict):
+    index: int
+    left: float
+    width: float
+    end: float
+    type: str
+
+
+class EventDetail(TypedDict):
+    label: str
+    description: str
+
+
+class EventBin(TypedDict):
+    first: int
+    count: int
+    start: float
+    end: float
+    left: float
+    width: float
+    weight: float
+    conflicts: int
+    proposals: int
+
+
+class BinStatus(TypedDict):
+    active: int
+    failed: int
+
+
+class TimelineLayer(TypedDict):
+    visible: int
+    dots: list[EventDot]
+    bins: list[EventBin]
 
 
 class TimelineState(rx.State):
-    timelines: list[TimelineItem] = [
+    """Timeline definitions plus the playback state that changes while playing."""
+
+    session_name: str = ""
+    new_session_name: str = ""
+    session_viewers: int = 0
+    timelines: list[TimelineItem] = []
+    timeline_total: int = 0
+    timeline_offset: int = 0
+    triggered_counts: dict[str, int] = {}
+    action_statuses: dict[str, dict[str, str]] = {}
+    log_counts: dict[str, int] = {}
+    log_pages: dict[str, list[EventLog]] = {}
+    log_offsets: dict[str, int] = {}
+    # Rows an open panel can page through; log_counts also counts dropped ones.
+    log_available: dict[str, int] = {}
+    timeline_views: dict[str, TimelineView] = {}
+    timeline_layers: dict[str, TimelineLayer] = {}
+    bin_statuses: dict[str, dict[str, BinStatus]] = {}
+    event_details: dict[str, EventDetail] = {}
+    active_counts: dict[str, int] = {}
+    active_labels: dict[str, list[str]] = {}
+    new_timeline_name: str = ""
+    new_timeline_type: str = "proposal_fkey"
+    import_status: str = ""
+    global_current_time: float = 0.0
+    global_is_playing: bool = False
+    global_max_duration: float = 120.0
+    playback_rate: float = 1.0
+    seek_mode: str = "skip"
+    playback_anchor: PlaybackAnchor = {
+        "position": 0.0,
+        "wall_time": 0.0,
+        "rate": 1.0,
+        "is_playing": False,
+    }
+    _clock: PlaybackClock = PlaybackClock()
+    _schedule: PlaybackSchedule = PlaybackSchedule()
+    _playback_generation: int = 0
+    _scrub_seq: float = 0.0
+    _action_epoch: int = 0
+    _fire_seq: int = 0
+    _timelines: list[TimelineItem] = [
         {
             "id": "t1",
             "name": "Project Alpha Timeline",
             "type": "proposal_fkey",
             "duration": 120.0,
-            "current_time": 0.0,
-            "formatted_current_time": "00:00",
             "formatted_duration": "02:00",
-            "progress_percent": 0.0,
-            "is_playing": False,
-            "events": [
+            "event_count": 2,
+        }
+    ]
+    _timeline_window: tuple[int, int] = (0, 4)
+    _visible_ids: set[str] = set()
+    _timeline_views: dict[str, TimelineView] = {}
+    _action_statuses: dict[str, dict[str, str]] = {}
+    _action_fires: dict[str, dict[str, int]] = {}
+    _hosted_session: str = ""
+    _timelines_revision: int = 0
+    _seen_revision: int = -1
+    _timeline_events: dict[str, EventStore] = {
+        "t1": EventStore.from_events(
+            [
                 {
                     "id": "e1",
                     "time": 15.0,
                     "label": "Initial Proposal",
                     "type": "proposal",
                     "description": "Project kickoff proposal submitted",
-                    "status": "pending",
                 },
                 {
                     "id": "e2",
                     "time": 45.5,
+                    "end": 70.0,
                     "label": "Resource Conflict",
                     "type": "conflict",
                     "description": "Server allocation conflict detected",
-                    "status": "pending",
                 },
-            ],
-            "logs": [],
-        }
-    ]
-    new_timeline_name: str = ""
-    new_timeline_type: str = "proposal_fkey"
-    global_current_time: float = 0.0
-    global_is_playing: bool = False
-    global_max_duration: float = 120.0
+            ]
+        )
+    }
+    _event_indexes: dict[str, EventIndex] = {}
+    _interval_indexes: dict[str, IntervalIndex] = {}
+    _binners: dict[str, EventBinner] = {}
+    _log_stores: dict[str, EventLogStore] = {}
+    _store_session: str = ""
+    _checkpointed_at: float = 0.0
+    _resume_cursors: set[str] = set()
+    _resume_logs: set[str] = set()
 
     @rx.var
     def formatted_global_time(self) -> str:
@@ -82,59 +253,476 @@ class TimelineState(rx.State):
     def formatted_global_duration(self) -> str:
         return self._format_time(self.global_max_duration)
 
-    def _trigger_event_action(self, timeline: TimelineItem, event: TimelineEvent):
-        """Executes backend action based on event type."""
-        action_msg = ""
-        if event["type"] == "conflict":
-            action_msg = f"CONFLICT DETECTED: Logging incident {event['id']}"
-            logging.info(f"[Backend] {action_msg}")
-        elif event["type"] == "proposal":
-            action_msg = f"PROPOSAL SENT: Dispatching proposal {event['id']}"
-            logging.info(f"[Backend] {action_msg}")
-        else:
-            action_msg = f"EVENT TRIGGERED: Processing generic event {event['id']}"
-        timestamp = self._format_time(timeline["current_time"])
-        timeline["logs"].insert(
-            0,
-            {
-                "timestamp": timestamp,
-                "event_label": event["label"],
-                "action": action_msg,
-            },
+    def _get_log_store(self, timeline_id: str) -> EventLogStore:
+        """Returns the log store of a timeline, creating it on first use."""
+        store = self._log_stores.get(timeline_id)
+        if store is None:
+            spill_path = None
+            if SPILL_DIR:
+                token = self._client_token() or "local"
+                spill_path = os.path.join(SPILL_DIR, f"{token}-{timeline_id}.jsonl")
+            store = EventLogStore(spill_path=spill_path)
+            if timeline_id in self._resume_logs:
+                self._resume_logs.discard(timeline_id)
+                store.restore(
+                    *session_store.load_logs(
+                        self._store_session, timeline_id, store.capacity
+                    )
+                )
+            self._log_stores[timeline_id] = store
+        return store
+
+    def _log_total(self, timeline_id: str) -> int:
+        """Returns how many log rows a timeline has, loading resumed logs."""
+        if timeline_id in self._log_stores or timeline_id in self._resume_logs:
+            return self._get_log_store(timeline_id).total
+        return 0
+
+    def _add_log(
+        self, timeline_id: str, event_label: str, action: str, position: float
+    ):
+        """Logs a row about the event at `position`, which a rollback goes by."""
+        store = self._get_log_store(timeline_id)
+        row = log_row(self.global_current_time, event_label, action)
+        store.append(row, position)
+        if self._store_session:
+            session_store.add_log(self._store_session, timeline_id, position, row)
+        if timeline_id in self._visible_ids:
+            self.log_counts[timeline_id] = store.total
+        offset = self.log_offsets.get(timeline_id)
+        if offset == 0:
+            self._load_log_page(timeline_id, 0)
+        elif offset is not None:
+            # Keep showing the same rows while newer ones arrive.
+            self.log_offsets[timeline_id] = offset + 1
+            self.log_available[timeline_id] = store.available
+
+    def _load_log_page(self, timeline_id: str, offset: int):
+        store = self._get_log_store(timeline_id)
+        offset = max(min(offset, store.available - LOG_PAGE_SIZE), 0)
+        self.log_offsets[timeline_id] = offset
+        self.log_available[timeline_id] = store.available
+        self.log_pages[timeline_id] = store.page(offset, LOG_PAGE_SIZE)
+
+    def _trigger_event_action(
+        self, timeline: TimelineItem, event: TimelineEvent, index: int
+    ) -> ActionJob | None:
+        """Logs a triggered event and returns the backend action to dispatch."""
+        playback_metrics.events_fired += 1
+        self._add_log(
+            timeline["id"], event["label"], describe_action(event), event["time"]
         )
+        if not action_dispatcher.has_handler(event["type"], timeline["type"]):
+            return None
+        playback_metrics.actions_triggered += 1
+        self._set_action_status(timeline["id"], str(index), "triggered")
+        return self._action_job(timeline, event, index)
 
-    def _format_time(self, seconds: float) -> str:
-        minutes = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{minutes:02d}:{secs:02d}"
-
-    def _update_timeline_display_data(self, timeline: TimelineItem):
-        """Updates computed display fields for a timeline."""
-        timeline["formatted_current_time"] = self._format_time(timeline["current_time"])
-        timeline["progress_percent"] = (
-            timeline["current_time"] / timeline["duration"] * 100
-            if timeline["duration"] > 0
-            else 0
+    def _exit_event_action(
+        self, timeline: TimelineItem, event: TimelineEvent, index: int
+    ) -> ActionJob | None:
+        """Logs an interval event that ended and returns its exit action, if any."""
+        self._add_log(
+            timeline["id"], event["label"], describe_exit(event), event["end"]
         )
+        if not action_dispatcher.has_handler(event["type"], timeline["type"], "exit"):
+            return None
+        return self._action_job(timeline, event, index, "exit")
 
-    def _sync_all_timelines(self):
-        """Syncs all timelines to global time and checks triggers."""
-        for timeline in self.timelines:
-            timeline["current_time"] = min(
-                self.global_current_time, timeline["duration"]
+    def _action_job(
+        self,
+        timeline: TimelineItem,
+        event: TimelineEvent,
+        index: int,
+        transition: str = "enter",
+    ) -> ActionJob:
+        self._fire_seq += 1
+        if transition == "enter":
+            self._action_fires.setdefault(timeline["id"], {})[str(index)] = (
+                self._fire_seq
             )
-            self._update_timeline_display_data(timeline)
+        return ActionJob(
+            timeline["id"],
+            timeline["type"],
+            index,
+            event,
+            functools.partial(
+                _report_action_result,
+                self._client_token(),
+                self._action_epoch,
+                self._fire_seq,
+            ),
+            transition,
+        )
+
+    def _apply_action_result(self, epoch: int, fire: int, result: ActionResult):
+        """Moves a triggered event to completed or failed, unless it was refired."""
+        if result.transition == "exit":
+            if epoch == self._action_epoch and result.status == "failed":
+                self._add_log(
+                    result.timeline_id,
+                    result.event["label"],
+                    result.message,
+                    result.event["end"],
+                )
+            return
+        statuses = self._action_statuses.get(result.timeline_id)
+        key = str(result.event_index)
+        if epoch != self._action_epoch or statuses is None:
+            return
+        if statuses.get(key) != "triggered":
+            return
+        if self._action_fires.get(result.timeline_id, {}).get(key) != fire:
+            return
+        if result.status == "completed":
+            self._set_action_status(result.timeline_id, key, None)
+        else:
+            self._set_action_status(result.timeline_id, key, result.status)
+            self._add_log(
+                result.timeline_id,
+                result.event["label"],
+                result.message,
+                result.event["time"],
+            )
+
+    def _set_action_status(self, timeline_id: str, key: str, status: str | None):
+        """Records an unfinished action, publishing it if the card is shown."""
+        statuses = self._action_statuses.setdefault(timeline_id, {})
+        if status is None:
+            statuses.pop(key, None)
+        else:
+            statuses[key] = status
+        if status != "triggered":
+            self._action_fires.get(timeline_id, {}).pop(key, None)
+        if self._store_session:
+            session_store.set_status(self._store_session, timeline_id, key, status)
+        if timeline_id in self._visible_ids:
+            self.action_statuses[timeline_id] = dict(statuses)
+            self._refresh_bin_statuses(timeline_id)
+
+    def _forget_actions_from(self, timeline_id: str, cursor: int):
+        """Drops action statuses of events the cursor was rewound past."""
+        statuses = self._action_statuses.get(timeline_id)
+        if statuses and any(int(key) >= cursor for key in statuses):
+            for key in [key for key in statuses if int(key) >= cursor]:
+                self._set_action_status(timeline_id, key, None)
+
+    def _format_time(self, seconds: float) -> str:
+        return format_time(seconds)
+
+    def _timeline_time(self, timeline: TimelineItem) -> float:
+        """Returns the global playhead clamped to the timeline's duration."""
+        return min(self.global_current_time, timeline["duration"])
+
+    def _get_event_index(self, timeline: TimelineItem) -> EventIndex:
+        """Returns the event index of a timeline, building it on first use."""
+        index = self._event_indexes.get(timeline["id"])
+        if index is None:
+            events = self._timeline_events[timeline["id"]]
+            index = EventIndex(events.times)
+            intervals = None
+            if events.interval_count:
+                intervals = IntervalIndex(events.times, events.ends)
+                self._interval_indexes[timeline["id"]] = intervals
+            if timeline["id"] in self._resume_cursors:
+                # Events up to the resumed playhead already fired before.
+                self._resume_cursors.discard(timeline["id"])
+                index.advance(self._timeline_time(timeline))
+                if intervals is not None:
+                    intervals.advance_exits(self._timeline_time(timeline))
+            self._event_indexes[timeline["id"]] = index
+        return index
+
+    def _get_schedule(self) -> PlaybackSchedule:
+        """Returns the due-time schedule of all timelines, rebuilt if stale."""
+        schedule = self._schedule
+        if schedule.revision != self._timelines_revision:
+            # The unwrapped list, so the schedule holds plain timelines.
+            timelines = self._timelines.__wrapped__
+            schedule.rebuild(
+                self._timelines_revision,
+                (
+                    ScheduledTimeline(
+                        timeline,
+                        self._get_event_index(timeline),
+                        self._interval_indexes.get(timeline["id"]),
+                    )
+                    for timeline in timelines
+                ),
+            )
+        return schedule
+
+    def _publish_active(self, timeline: TimelineItem):
+        """Publishes how many interval events of a shown card are active."""
+        timeline_id = timeline["id"]
+        intervals = self._interval_indexes.get(timeline_id)
+        if intervals is None or timeline_id not in self._visible_ids:
+            return
+        count = self._event_indexes[timeline_id].cursor - intervals.exits.cursor
+        labels = []
+        if count:
+            events = self._timeline_events[timeline_id]
+            labels = [
+                events.labels[events.label_codes[i]]
+                for i in intervals.active(
+                    self._timeline_time(timeline), ACTIVE_LIST_LIMIT
+                )
+            ]
+        if self.active_counts.get(timeline_id) != count:
+            self.active_counts[timeline_id] = count
+        if self.active_labels.get(timeline_id) != labels:
+            self.active_labels[timeline_id] = labels
+
+    def _set_triggered_count(self, timeline_id: str, count: int):
+        """Publishes a timeline's cursor, leaving the var clean if it did not move."""
+        if timeline_id not in self._visible_ids:
+            return
+        if self.triggered_counts.get(timeline_id) != count:
+            self.triggered_counts[timeline_id] = count
+
+    def _get_timeline(self, timeline_id: str) -> TimelineItem | None:
+        return next((t for t in self._timelines if t["id"] == timeline_id), None)
+
+    def _publish_window(self, first: int, count: int, force: bool = False):
+        """Sends the browser the cards from `first` on and their playback vars."""
+        first = min(max(first, 0), max(len(self._timelines) - 1, 0))
+        count = max(count, 1)
+        self._timeline_window = (first, count)
+        window = self._timelines[first : first + count]
+        if (
+            not force
+            and first == self.timeline_offset
+            and self.timeline_total == len(self._timelines)
+            and [t["id"] for t in window] == [t["id"] for t in self.timelines]
+        ):
+            return
+        self.timeline_offset = first
+        self.timeline_total = len(self._timelines)
+        self.timelines = window
+        self._visible_ids = {t["id"] for t in window}
+        self.triggered_counts = {
+            t["id"]: self._get_event_index(t).cursor for t in window
+        }
+        self.action_statuses = {
+            t["id"]: dict(self._action_statuses.get(t["id"], {})) for t in window
+        }
+        self.log_counts = {t["id"]: self._log_total(t["id"]) for t in window}
+        self.active_counts = {}
+        self.active_labels = {}
+        for timeline in window:
+            self._publish_active(timeline)
+        self.timeline_views = {t["id"]: self._get_view(t) for t in window}
+        self.timeline_layers = {}
+        self.bin_statuses = {}
+        for timeline in window:
+            self._refresh_layer(timeline["id"])
+        # Event-details panels of cards that scrolled away close.
+        self.log_pages = {
+            k: v for k, v in self.log_pages.items() if k in self._visible_ids
+        }
+        self.log_offsets = {
+            k: v for k, v in self.log_offsets.items() if k in self._visible_ids
+        }
+        self.log_available = {
+            k: v for k, v in self.log_available.items() if k in self._visible_ids
+        }
+
+    def _republish_window(self):
+        """Republishes the current window after timelines changed."""
+        self._publish_window(*self._timeline_window, force=True)
+
+    def _get_view(self, timeline: TimelineItem) -> TimelineView:
+        """Returns a timeline's zoom window, the whole timeline by default."""
+        view = self._timeline_views.get(timeline["id"])
+        if view is None:
+            view = self._make_view(0.0, timeline["duration"])
+            self._timeline_views[timeline["id"]] = view
+        return view
+
+    def _make_view(self, start: float, end: float) -> TimelineView:
+        return {
+            "start": start,
+            "end": end,
+            "label": f"{format_time(start)} – {format_time(end)}",
+        }
+
+    def _get_binner(self, timeline_id: str) -> EventBinner:
+        """Returns the bin aggregator of a timeline, building it on first use."""
+        binner = self._binners.get(timeline_id)
+        if binner is None:
+            binner = EventBinner(self._timeline_events[timeline_id])
+            self._binners[timeline_id] = binner
+        return binner
+
+    def _refresh_layer(self, timeline_id: str):
+        """Rebuilds what a timeline's track shows for its zoom window."""
+        view = self._timeline_views[timeline_id]
+        binner = self._get_binner(timeline_id)
+        window = binner.window(view["start"], view["end"])
+        span = view["end"] - view["start"]
+        earlier = []
+        intervals = self._interval_indexes.get(timeline_id)
+        if intervals is not None and len(window) <= DOT_LIMIT:
+            # Interval events that started before the window but reach into it.
+            earlier = [
+                i
+                for i in intervals.active(view["start"], DOT_LIMIT + 1)
+                if i < window.start
+            ]
+        if len(earlier) + len(window) <= DOT_LIMIT:
+            events = self._timeline_events[timeline_id]
+            times, ends = events.times, events.ends
+            self.bin_statuses.pop(timeline_id, None)
+            self.timeline_layers[timeline_id] = {
+                "visible": len(earlier) + len(window),
+                "dots": [
+                    {
+                        "index": i,
+                        "left": (max(times[i], view["start"]) - view["start"])
+                        / span
+                        * 100,
+                        "width": (
+                            min(ends[i], view["end"]) - max(times[i], view["start"])
+                        )
+                        / span
+                        * 100,
+                        "end": ends[i],
+                        "type": events.types[events.type_codes[i]],
+                    }
+                    for i in (*earlier, *window)
+                ],
+                "bins": [],
+            }
+            return
+        self.timeline_layers[timeline_id] = {
+            "visible": len(window),
+            "dots": [],
+            "bins": binner.bins(view["start"], view["end"]),
+        }
+        self.bin_statuses[timeline_id] = {}
+        self._refresh_bin_statuses(timeline_id)
+
+    def _refresh_bin_statuses(self, timeline_id: str):
+        """Republishes which bins of a binned card hold unfinished actions."""
+        if timeline_id not in self.bin_statuses:
+            return
+        view = self._timeline_views[timeline_id]
+        split = bin_statuses(
+            self._get_binner(timeline_id).bins(view["start"], view["end"]),
+            self._action_statuses.get(timeline_id, {}),
+        )
+        if self.bin_statuses[timeline_id] != split:
+            self.bin_statuses[timeline_id] = split
+
+    def _set_view(self, timeline_id: str, start: float, end: float):
+        """Moves a timeline's zoom window, keeping it inside the timeline."""
+        timeline = self._get_timeline(timeline_id)
+        if timeline is None:
+            return
+        duration = timeline["duration"]
+        span = min(max(float(end) - float(start), MIN_VIEW_SECONDS), duration)
+        start = min(max(float(start), 0.0), duration - span)
+        view = self._make_view(start, start + span)
+        self._timeline_views[timeline_id] = view
+        if timeline_id in self._visible_ids:
+            self.timeline_views[timeline_id] = view
+            self._refresh_layer(timeline_id)
+
+    def _seek_timelines(self) -> list[ActionJob]:
+        """Moves every timeline's cursor to the playhead after a seek."""
+        jobs = []
+        for timeline in self._timelines:
+            index = self._get_event_index(timeline)
+            intervals = self._interval_indexes.get(timeline["id"])
+            position = self._timeline_time(timeline)
+            if index.rewind(position):
+                self._forget_actions_from(timeline["id"], index.cursor)
+            if self.seek_mode == "rollback":
+                self._rollback_logs(timeline["id"], position)
+            skipped = index.advance(position)
+            ended = []
+            if intervals is not None:
+                intervals.rewind_exits(position)
+                ended = intervals.advance_exits(position)
+            if (skipped or ended) and self.seek_mode == "batch":
+                jobs.extend(self._fire_skipped(timeline, skipped, ended))
+            self._set_triggered_count(timeline["id"], index.cursor)
+            self._publish_active(timeline)
+        self._schedule.invalidate()
+        return jobs
+
+    def _fire_skipped(
+        self, timeline: TimelineItem, skipped: range, ended: list[int]
+    ) -> list[ActionJob]:
+        """Logs one row for the events a seek jumped over and returns their actions."""
+        events = self._timeline_events[timeline["id"]]
+        codes = {
+            code
+            for code, event_type in enumerate(events.types.values)
+            if action_dispatcher.has_handler(event_type, timeline["type"])
+        }
+        exit_codes = {
+            code
+            for code, event_type in enumerate(events.types.values)
+            if action_dispatcher.has_handler(event_type, timeline["type"], "exit")
+        }
+        jobs = [
+            self._action_job(timeline, events.event(i), i, "exit")
+            for i in ended
+            if events.type_codes[i] in exit_codes
+        ]
+        if codes:
+            statuses = self._action_statuses.setdefault(timeline["id"], {})
+            for i in skipped:
+                if events.type_codes[i] in codes:
+                    statuses[str(i)] = "triggered"
+                    jobs.append(self._action_job(timeline, events.event(i), i))
+            if jobs and timeline["id"] in self._visible_ids:
+                self.action_statuses[timeline["id"]] = dict(statuses)
+                self._refresh_bin_statuses(timeline["id"])
+        label = f"{len(skipped)} skipped events"
+        if ended:
+            label += f", {len(ended)} ended"
+        self._add_log(
+            timeline["id"],
+            label,
+            f"SEEK: Fired {len(jobs)} actions in one batch",
+            self._timeline_time(timeline),
+        )
+        return jobs
+
+    def _rollback_logs(self, timeline_id: str, position: float):
+        """Drops the log rows of events after the timeline's position."""
+        store = self._log_stores.get(timeline_id)
+        removed = store.rollback(position) if store else 0
+        if not removed:
+            return
+        if self._store_session:
+            session_store.rollback_logs(self._store_session, timeline_id, position)
+        if timeline_id in self._visible_ids:
+            self.log_counts[timeline_id] = store.total
+        if timeline_id in self.log_offsets:
+            self._load_log_page(timeline_id, self.log_offsets[timeline_id])
 
     def _calculate_max_duration(self):
-        if not self.timelines:
+        if not self._timelines:
             self.global_max_duration = 120.0
         else:
-            self.global_max_duration = max((t["duration"] for t in self.timelines))
+            self.global_max_duration = max((t["duration"] for t in self._timelines))
 
     @rx.event
     def add_timeline(self):
         if not self.new_timeline_name:
             return
+        name, self.new_timeline_name = self.new_timeline_name, ""
+        if self.session_name:
+            return TimelineState.session_command(
+                "_create_timeline", [name, self.new_timeline_type]
+            )
+        return self._create_timeline(name, self.new_timeline_type)
+
+    def _create_timeline(self, name: str, timeline_type: str):
+        """Adds a timeline of three random events."""
         duration = 120.0
         events = []
         for i in range(3):
@@ -149,91 +737,751 @@ class TimelineState(rx.State):
                 }
             )
         events.sort(key=lambda x: x["time"])
-        for event in events:
-            event["status"] = "pending"
-        new_item: TimelineItem = {
-            "id": "".join(random.choices(string.ascii_letters + string.digits, k=8)),
-            "name": self.new_timeline_name,
-            "type": self.new_timeline_type,
-            "duration": duration,
-            "current_time": 0.0,
-            "formatted_current_time": "00:00",
-            "formatted_duration": self._format_time(duration),
-            "progress_percent": 0.0,
-            "is_playing": False,
-            "events": events,
-            "logs": [],
-        }
-        self.timelines.append(new_item)
-        self.new_timeline_name = ""
+        self._register_timeline(
+            {
+                "id": "".join(
+                    random.choices(string.ascii_letters + string.digits, k=8)
+                ),
+                "name": name,
+                "type": timeline_type,
+                "duration": duration,
+                "formatted_duration": self._format_time(duration),
+                "events": EventStore.from_events(events),
+            }
+        )
         self._calculate_max_duration()
+        self._republish_window()
+        return self._restart_playback_loop()
+
+    @rx.event
+    async def import_timeline_files(self, files: list[rx.UploadFile]):
+        """Adds the timelines of uploaded JSONL/CSV files, replacing same ids."""
+        for file in files:
+            name = os.path.basename(file.name or "import")
+            path = rx.get_upload_dir() / f"{uuid.uuid4().hex}-{name}"
+            stats = ImportStats()
+            try:
+                await asyncio.to_thread(self._save_upload, file, path)
+                imported = await asyncio.to_thread(
+                    list, import_timelines(str(path), stats)
+                )
+            except (ValueError, OSError) as e:
+                logging.exception(f"Error importing {name}: {e}")
+                self.import_status = f"Import of {name} failed: {e}"
+                continue
+            finally:
+                path.unlink(missing_ok=True)
+            if self.session_name:
+                async with _session_host(self.session_name) as host:
+                    host._add_imported(imported)
+            else:
+                self._add_imported(imported)
+            self.import_status = stats.summary()
+        if not self.session_name:
+            return self._restart_playback_loop()
+
+    def _add_imported(self, imported: list[dict]):
+        """Adds imported timelines, replacing the ones with the same ids."""
+        imported_ids = {t["id"] for t in imported}
+        for timeline in self._timelines:
+            if timeline["id"] in imported_ids:
+                self._forget_timeline(timeline["id"])
+        self._timelines = [t for t in self._timelines if t["id"] not in imported_ids]
+        for timeline in imported:
+            self._register_timeline(timeline)
+        self._calculate_max_duration()
+        self._republish_window()
+        # The loop is restarted here for session hosts; a client's own
+        # loop is restarted by the event its import handler returns.
+        if self._hosted_session:
+            self._restart_playback_loop()
+
+    def _save_upload(self, file: rx.UploadFile, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as out:
+            shutil.copyfileobj(file.file, out, READ_BUFFER)
+
+    def _register_timeline(self, timeline: dict):
+        """Adds a timeline, keeping its events on the backend."""
+        timeline_id = timeline["id"]
+        events = timeline.pop("events")
+        timeline["event_count"] = len(events)
+        self._timeline_events[timeline_id] = events
+        self._timelines.append(timeline)
+        self._timelines_revision += 1
+        if self._store_session:
+            session_store.save_timeline(self._store_session, timeline, events)
+
+    def _forget_timeline(self, timeline_id: str):
+        """Drops the playback entries of a removed timeline."""
+        self._timelines_revision += 1
+        self._timeline_events.pop(timeline_id, None)
+        self._event_indexes.pop(timeline_id, None)
+        self._interval_indexes.pop(timeline_id, None)
+        self._binners.pop(timeline_id, None)
+        self._timeline_views.pop(timeline_id, None)
+        self._action_statuses.pop(timeline_id, None)
+        self._action_fires.pop(timeline_id, None)
+        self._visible_ids.discard(timeline_id)
+        self.timeline_views.pop(timeline_id, None)
+        self.bin_statuses.pop(timeline_id, None)
+        self.timeline_layers.pop(timeline_id, None)
+        self.triggered_counts.pop(timeline_id, None)
+        self.action_statuses.pop(timeline_id, None)
+        self.log_counts.pop(timeline_id, None)
+        self.active_counts.pop(timeline_id, None)
+        self.active_labels.pop(timeline_id, None)
+        self.log_pages.pop(timeline_id, None)
+        self.log_offsets.pop(timeline_id, None)
+        self.log_available.pop(timeline_id, None)
+        store = self._log_stores.pop(timeline_id, None)
+        if store is not None:
+            store.delete_spill()
+        self._forget_details(timeline_id)
+        self._resume_cursors.discard(timeline_id)
+        self._resume_logs.discard(timeline_id)
+        if self._store_session:
+            session_store.delete_timeline(self._store_session, timeline_id)
 
     @rx.event
     def delete_timeline(self, timeline_id: str):
-        self.timelines = [t for t in self.timelines if t["id"] != timeline_id]
+        if self.session_name:
+            return TimelineState.session_command("delete_timeline", [timeline_id])
+        self._timelines = [t for t in self._timelines if t["id"] != timeline_id]
+        self._forget_timeline(timeline_id)
         self._calculate_max_duration()
+        self._republish_window()
         if self.global_current_time > self.global_max_duration:
             self.global_current_time = self.global_max_duration
-            self._sync_all_timelines()
+            self._clock.seek(self.global_max_duration)
+            self._publish_anchor()
+            self._seek_timelines()
+        return self._restart_playback_loop()
+
+    def _publish_anchor(self):
+        """Sends the clock's anchor to the browser and checkpoints the session."""
+        self.playback_anchor = {
+            "position": min(self._clock.position(), self.global_max_duration),
+            "wall_time": time.time() * 1000,
+            "rate": self._clock.rate,
+            "is_playing": self._clock.is_playing,
+        }
+        self._checkpoint()
+
+    def _checkpoint(self):
+        """Saves the playhead and action statuses of a persisted session."""
+        if not self._store_session:
+            return
+        self._checkpointed_at = time.monotonic()
+        session_store.checkpoint(
+            self._store_session,
+            self.global_current_time,
+            self._clock.rate,
+            self.seek_mode,
+            {key: dict(value) for key, value in self._action_statuses.items()},
+        )
+
+    async def _attach_store(self):
+        """Resumes this session from the session store, or starts saving it."""
+        if session_store is None or self._store_session:
+            return
+        self._store_session = self._client_token()
+        saved = await asyncio.to_thread(session_store.load_session, self._store_session)
+        if saved is None:
+            self._save_session()
+        else:
+            self._resume(saved)
+
+    def _save_session(self):
+        """Writes every timeline definition, replacing what the store had."""
+        session_store.delete_session(self._store_session)
+        for timeline in self._timelines:
+            session_store.save_timeline(
+                self._store_session, timeline, self._timeline_events[timeline["id"]]
+            )
+        self._checkpoint()
+
+    def _resume(self, saved: dict):
+        """Restores a saved session; events and logs load when first needed."""
+        self._timelines = [
+            {**timeline, "formatted_duration": format_time(timeline["duration"])}
+            for timeline in saved["timelines"]
+        ]
+        ids = {timeline["id"] for timeline in self._timelines}
+        self._timeline_events = LazyEvents(self._store_session)
+        self._event_indexes = {}
+        self._interval_indexes = {}
+        self._binners = {}
+        self._timeline_views = {}
+        self._log_stores = {}
+        self._resume_cursors = set(ids)
+        self._resume_logs = set(ids)
+        self._timelines_revision += 1
+        self._action_fires = {}
+        # Actions in flight when the backend went away never report back,
+        # so they count as failed; the checkpoint below saves that.
+        self._action_statuses = {
+            timeline_id: {
+                key: "failed" if status == "triggered" else status
+                for key, status in statuses.items()
+            }
+            for timeline_id, statuses in saved["statuses"].items()
+            if timeline_id in ids
+        }
+        self.seek_mode = saved["seek_mode"]
+        self._clock.set_rate(saved["rate"])
+        self.playback_rate = self._clock.rate
+        self._calculate_max_duration()
+        self.global_current_time = min(saved["position"], self.global_max_duration)
+        self._clock.seek(self.global_current_time)
+        self._publish_anchor()
+
+    def _stop_playback_loop(self):
+        """Invalidates the running playback loop and cancels it if it is local."""
+        self._playback_generation += 1
+        task = _playback_tasks.pop(self._client_token(), None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    def _restart_playback_loop(self):
+        """Replaces the playback loop so it recomputes when to wake up."""
+        self._stop_playback_loop()
+        if not self.global_is_playing:
+            return None
+        if self._hosted_session:
+            # A session host has no browser to send the event to.
+            _spawn(
+                _playback_loop(
+                    functools.partial(_session_host, self._hosted_session),
+                    self._playback_generation,
+                )
+            )
+            return None
+        return TimelineState.run_playback(self._playback_generation)
+
+    def _tick(self) -> list[ActionJob]:
+        """Fires the events crossed up to the clock's position."""
+        position = min(self._clock.position(), self.global_max_duration)
+        schedule = self._get_schedule()
+        jobs = []
+        fired = False
+        for order, entry in schedule.pop_due(position):
+            timeline, index, intervals = entry
+            timeline_time = min(position, timeline["duration"])
+            crossed = index.advance(timeline_time)
+            ended = intervals.advance_exits(timeline_time) if intervals else []
+            schedule.push(order, entry)
+            if not crossed and not ended:
+                continue
+            fired = True
+            self.global_current_time = position
+            events = self._timeline_events[timeline["id"]]
+            for _, transition, i in firing_order(
+                events.times, events.ends, crossed, ended
+            ):
+                if transition == "enter":
+                    job = self._trigger_event_action(timeline, events.event(i), i)
+                else:
+                    job = self._exit_event_action(timeline, events.event(i), i)
+                if job is not None:
+                    jobs.append(job)
+            self._set_triggered_count(timeline["id"], index.cursor)
+            self._publish_active(timeline)
+        if fired and self._store_session:
+            session_store.save_position(self._store_session, position)
+        if position >= self.global_max_duration:
+            self.global_current_time = position
+            self.global_is_playing = False
+            self._clock.pause()
+            self._clock.seek(self.global_max_duration)
+            self._publish_anchor()
+        return jobs
+
+    def _seconds_until_next_event(self) -> float:
+        """Returns the real time until the next event or end fires or playback ends."""
+        next_time = self._get_schedule().next_time()
+        if next_time is None or next_time > self.global_max_duration:
+            next_time = self.global_max_duration
+        return max((next_time - self._clock.position()) / self._clock.rate, 0.0)
+
+    @rx.event
+    async def load_timeline_window(self):
+        """Publishes the window of cards the page last showed."""
+        await self._attach_store()
+        token = self._client_token()
+        name = self.session_name
+        if name and token not in _session_subscribers.get(name, ()):
+            # Membership is per process, so a restarted or other backend
+            # worker has to be told again that this client follows the session.
+            _session_subscribers.setdefault(name, set()).add(token)
+            self._seen_revision = -1
+            async with _session_host(name):
+                pass
+        self._republish_window()
+
+    @rx.event
+    def scroll_timelines(self, list_top: float, viewport_height: float):
+        """Moves the window of cards to the ones in or near the viewport."""
+        # list_top is the list's top edge relative to the viewport.
+        top = max(-float(list_top), 0.0)
+        first = int(top // TIMELINE_ROW_HEIGHT) - TIMELINE_OVERSCAN
+        last = int((top + float(viewport_height)) // TIMELINE_ROW_HEIGHT)
+        self._publish_window(first, last + TIMELINE_OVERSCAN + 1 - max(first, 0))
+
+    @rx.event
+    def zoom_timeline(self, timeline_id: str, start: float, end: float):
+        self._set_view(timeline_id, start, end)
+
+    @rx.event
+    def zoom_in(self, timeline_id: str):
+        view = self._timeline_views.get(timeline_id)
+        if view is None:
+            return
+        center = (view["start"] + view["end"]) / 2
+        quarter = (view["end"] - view["start"]) / 4
+        self._set_view(timeline_id, center - quarter, center + quarter)
+
+    @rx.event
+    def zoom_out(self, timeline_id: str):
+        view = self._timeline_views.get(timeline_id)
+        if view is None:
+            return
+        center = (view["start"] + view["end"]) / 2
+        span = view["end"] - view["start"]
+        self._set_view(timeline_id, center - span, center + span)
+
+    @rx.event
+    def reset_zoom(self, timeline_id: str):
+        timeline = self._get_timeline(timeline_id)
+        if timeline is not None:
+            self._set_view(timeline_id, 0.0, timeline["duration"])
+
+    @rx.event
+    def load_event_detail(self, timeline_id: str, index: int):
+        """Sends the label and description of a hovered or clicked event."""
+        key = f"{timeline_id}/{index}"
+        if self._get_timeline(timeline_id) is None:
+            return
+        events = self._timeline_events[timeline_id]
+        if not 0 <= index < len(events):
+            return
+        self.event_details.pop(key, None)
+        if len(self.event_details) >= CLIENT_DETAIL_LIMIT:
+            del self.event_details[next(iter(self.event_details))]
+        self.event_details[key] = {
+            "label": events.labels[events.label_codes[index]],
+            "description": events.descriptions[index],
+        }
+
+    def _forget_details(self, timeline_id: str):
+        prefix = f"{timeline_id}/"
+        for key in [k for k in self.event_details if k.startswith(prefix)]:
+            del self.event_details[key]
+
+    @rx.event
+    def toggle_logs(self, timeline_id: str):
+        """Opens or closes a timeline's event-details panel."""
+        if timeline_id in self.log_pages:
+            self.log_pages.pop(timeline_id)
+            self.log_offsets.pop(timeline_id, None)
+            self.log_available.pop(timeline_id, None)
+        else:
+            self._load_log_page(timeline_id, 0)
+
+    @rx.event
+    def newer_logs(self, timeline_id: str):
+        self._load_log_page(
+            timeline_id, self.log_offsets.get(timeline_id, 0) - LOG_PAGE_SIZE
+        )
+
+    @rx.event
+    def older_logs(self, timeline_id: str):
+        self._load_log_page(
+            timeline_id, self.log_offsets.get(timeline_id, 0) + LOG_PAGE_SIZE
+        )
 
     @rx.event
     def global_toggle_play(self):
+        if self.session_name:
+            return TimelineState.session_command("global_toggle_play", [])
         self.global_is_playing = not self.global_is_playing
         if self.global_is_playing:
             if self.global_current_time >= self.global_max_duration:
                 self.global_current_time = 0.0
                 self.global_stop()
                 self.global_is_playing = True
-            return TimelineState.tick
+            self._clock.play()
+        else:
+            self._clock.pause()
+            self.global_current_time = min(
+                self._clock.position(), self.global_max_duration
+            )
+        self._publish_anchor()
+        return self._restart_playback_loop()
 
     @rx.event
     def global_stop(self):
+        if self.session_name:
+            return TimelineState.session_command("global_stop", [])
+        self._stop_playback_loop()
         self.global_is_playing = False
         self.global_current_time = 0.0
+        self._clock.pause()
+        self._clock.seek(0.0)
+        self._publish_anchor()
+        for timeline in self._timelines:
+            self._get_event_index(timeline).reset()
+        for intervals in self._interval_indexes.values():
+            intervals.exits.reset()
+        self._schedule.invalidate()
+        self._action_epoch += 1
+        self._action_statuses = {}
+        self._action_fires = {}
+        self.triggered_counts = {t["id"]: 0 for t in self.timelines}
+        self.action_statuses = {t["id"]: {} for t in self.timelines}
+        for timeline_id in self._visible_ids:
+            self._refresh_bin_statuses(timeline_id)
+        for store in self._log_stores.values():
+            store.clear()
+        self._resume_logs = set()
+        if self._store_session:
+            session_store.clear_progress(self._store_session)
+        self.log_counts = {t["id"]: 0 for t in self.timelines}
         for timeline in self.timelines:
-            timeline["current_time"] = 0.0
-            timeline["logs"] = []
-            for event in timeline["events"]:
-                event["status"] = "pending"
-            self._update_timeline_display_data(timeline)
-        self.timelines = self.timelines
+            self._publish_active(timeline)
+        self.log_pages = {timeline_id: [] for timeline_id in self.log_pages}
+        self.log_offsets = {timeline_id: 0 for timeline_id in self.log_offsets}
+        self.log_available = {timeline_id: 0 for timeline_id in self.log_available}
 
     @rx.event
     def global_seek(self, value: str):
+        if self.session_name:
+            return TimelineState.session_command("global_seek", [value])
         try:
             new_time = float(value)
             self.global_current_time = new_time
-            self._sync_all_timelines()
+            self._clock.seek(new_time)
+            jobs = self._seek_timelines()
+            self._publish_anchor()
+            if jobs:
+                _spawn(_submit_actions(jobs))
+            return self._restart_playback_loop()
         except ValueError as e:
             logging.exception(f"Error seeking: {e}")
 
+    @rx.event(background=True)
+    async def preview_seek(self, value: float, seq: float):
+        """Shows the triggered counts of visible cards where the slider is dragged."""
+        async with self:
+            if seq <= self._scrub_seq:
+                return
+            self._scrub_seq = seq
+            position = float(value)
+            for timeline in self.timelines:
+                times = self._timeline_events[timeline["id"]].times
+                count = bisect_right(times, min(position, timeline["duration"]))
+                if self.triggered_counts.get(timeline["id"]) != count:
+                    self.triggered_counts[timeline["id"]] = count
+
     @rx.event
-    async def tick(self):
-        """Global tick function to update all timelines."""
-        if (
-            self.global_is_playing
-            and self.global_current_time < self.global_max_duration
+    def commit_seek(self, value: str, seq: float):
+        """Seeks to where the slider was released, superseding its previews."""
+        self._scrub_seq = max(self._scrub_seq, seq)
+        return self.global_seek(value)
+
+    @rx.event
+    def set_playback_rate(self, value: str):
+        if self.session_name:
+            return TimelineState.session_command("set_playback_rate", [value])
+        try:
+            self._clock.set_rate(float(value))
+            self.playback_rate = self._clock.rate
+            self._publish_anchor()
+            return self._restart_playback_loop()
+        except ValueError as e:
+            logging.exception(f"Error setting playback rate: {e}")
+
+    @rx.event
+    def set_seek_mode(self, value: str):
+        if self.session_name:
+            return TimelineState.session_command("set_seek_mode", [value])
+        if value in SEEK_MODES:
+            self.seek_mode = value
+            self._checkpoint()
+
+    def _client_token(self) -> str:
+        if self._hosted_session:
+            return _session_token(self._hosted_session)
+        return self.router.session.client_token
+
+    def _follow_session(self, host: "TimelineState"):
+        """Mirrors a shared session's host into this client's vars."""
+        self._timelines = host._timelines
+        self._timeline_events = host._timeline_events
+        self._event_indexes = host._event_indexes
+        self._interval_indexes = host._interval_indexes
+        self._binners = host._binners
+        self._action_statuses = host._action_statuses
+        self._log_stores = host._log_stores
+        self._store_session = host._store_session
+        self._resume_cursors = host._resume_cursors
+        self._resume_logs = host._resume_logs
+        for name in (
+            "global_current_time",
+            "global_is_playing",
+            "global_max_duration",
+            "playback_rate",
+            "playback_anchor",
+            "seek_mode",
         ):
-            await asyncio.sleep(0.1)
-            self.global_current_time += 0.5
-            if self.global_current_time > self.global_max_duration:
-                self.global_current_time = self.global_max_duration
-            new_timelines = []
-            for timeline in self.timelines:
-                timeline["current_time"] = min(
-                    self.global_current_time, timeline["duration"]
+            if getattr(self, name) != getattr(host, name):
+                setattr(self, name, getattr(host, name))
+        viewers = len(_session_subscribers.get(self.session_name, ()))
+        if self.session_viewers != viewers:
+            self.session_viewers = viewers
+        if self._seen_revision != host._timelines_revision:
+            self._seen_revision = host._timelines_revision
+            ids = {t["id"] for t in self._timelines}
+            for timeline_id in {k.partition("/")[0] for k in self.event_details}:
+                if timeline_id not in ids:
+                    self._forget_details(timeline_id)
+            self._timeline_views = {
+                k: v for k, v in self._timeline_views.items() if k in ids
+            }
+            self._republish_window()
+        else:
+            self._refresh_window()
+
+    def _refresh_window(self):
+        """Republishes the playback vars of visible cards that changed."""
+        for timeline in self.timelines:
+            timeline_id = timeline["id"]
+            self._set_triggered_count(
+                timeline_id, self._get_event_index(timeline).cursor
+            )
+            self._publish_active(timeline)
+            statuses = self._action_statuses.get(timeline_id, {})
+            if self.action_statuses.get(timeline_id, {}) != statuses:
+                self.action_statuses[timeline_id] = dict(statuses)
+                self._refresh_bin_statuses(timeline_id)
+            total = self._log_total(timeline_id)
+            added = total - self.log_counts.get(timeline_id, 0)
+            if added:
+                self.log_counts[timeline_id] = total
+                offset = self.log_offsets.get(timeline_id)
+                if offset is not None:
+                    self._load_log_page(timeline_id, offset + added if offset else 0)
+
+    @rx.event(background=True)
+    async def join_session(self):
+        """Follows the shared session named in new_session_name."""
+        async with self:
+            name = self.new_session_name.strip()
+            if not name or name == self.session_name:
+                return
+            if self.session_name:
+                self._leave_session()
+            self._stop_playback_loop()
+            self.session_name = name
+            self._seen_revision = -1
+            token = self._client_token()
+        _session_subscribers.setdefault(name, set()).add(token)
+        # Leaving the host's context broadcasts it, this client included.
+        async with _session_host(name):
+            pass
+
+    @rx.event
+    def leave_session(self):
+        """Goes back to private playback of a copy of the session's timelines."""
+        if self.session_name:
+            self._leave_session()
+            self._republish_window()
+
+    def _leave_session(self):
+        _session_subscribers.get(self.session_name, set()).discard(self._client_token())
+        self.session_name = ""
+        self.session_viewers = 0
+        self._timelines = copy.deepcopy(self._timelines)
+        self._timeline_events = copy.copy(self._timeline_events)
+        self._binners = dict(self._binners)
+        self._event_indexes = {}
+        self._interval_indexes = {}
+        self._action_statuses = {}
+        self._action_fires = {}
+        self._log_stores = {}
+        self._resume_cursors = set()
+        self._resume_logs = set()
+        if self._store_session:
+            self._store_session = self._client_token()
+            self._save_session()
+        self.global_stop()
+
+    @rx.event(background=True)
+    async def session_command(self, command: str, args: list):
+        """Runs a playback command on the host of the session this client follows."""
+        if command not in SESSION_COMMANDS:
+            return
+        async with self:
+            name = self.session_name
+        if name:
+            async with _session_host(name) as host:
+                getattr(host, command)(*args)
+
+    @rx.event(background=True)
+    async def run_playback(self, generation: int):
+        """Single playback loop that sleeps until the next event is due."""
+        await _playback_loop(lambda: self, generation)
+
+
+async def _playback_loop(locked_state, generation: int):
+    """Ticks the state yielded by `locked_state()` until superseded or done."""
+    async with locked_state() as state:
+        if state._playback_generation != generation:
+            return
+        token = state._client_token()
+        _playback_tasks[token] = asyncio.current_task()
+    wake_at = None
+    try:
+        while True:
+            async with locked_state() as state:
+                if (
+                    state._playback_generation != generation
+                    or not state.global_is_playing
+                ):
+                    return
+                started = time.perf_counter()
+                drift = time.monotonic() - wake_at if wake_at is not None else 0.0
+                fired = playback_metrics.events_fired
+                jobs = state._tick()
+                fired = playback_metrics.events_fired - fired
+                playing = state.global_is_playing
+                wake_at = time.monotonic() + state._seconds_until_next_event()
+                tick_seconds = time.perf_counter() - started
+                if time.monotonic() - state._checkpointed_at >= CHECKPOINT_SECONDS:
+                    state._checkpoint()
+                delta_bytes = delta_seconds = None
+                if playback_metrics.sample_delta():
+                    started = time.perf_counter()
+                    delta_bytes = len(json_dumps(state.get_delta()).encode())
+                    delta_seconds = time.perf_counter() - started
+                position = state.global_current_time
+            started = time.perf_counter()
+            if jobs:
+                # Shielded so that pausing mid-submit still dispatches
+                # every action that was already logged as triggered.
+                await asyncio.shield(_submit_actions(jobs))
+            submit_seconds = time.perf_counter() - started
+            playback_metrics.observe_tick(
+                tick_seconds, drift, fired, submit_seconds, delta_bytes, delta_seconds
+            )
+            if tick_profiler is not None:
+                tick_profiler.record(
+                    token=token,
+                    position=position,
+                    tick_seconds=tick_seconds,
+                    drift_seconds=drift,
+                    events=fired,
+                    actions=len(jobs),
+                    submit_seconds=submit_seconds,
+                    delta_bytes=delta_bytes,
+                    delta_seconds=delta_seconds,
+                    queued_actions=action_dispatcher.stats()["queued"],
                 )
-                for event in timeline["events"]:
-                    if (
-                        event["status"] == "pending"
-                        and event["time"] <= timeline["current_time"]
-                    ):
-                        event["status"] = "triggered"
-                        self._trigger_event_action(timeline, event)
-                self._update_timeline_display_data(timeline)
-                new_timelines.append(timeline)
-            self.timelines = new_timelines
-            if self.global_current_time >= self.global_max_duration:
-                self.global_is_playing = False
-            else:
-                yield TimelineState.tick
\ No newline at end of file
+            if not playing:
+                return
+            await asyncio.sleep(max(wake_at - time.monotonic(), 0.0))
+    finally:
+        if _playback_tasks.get(token) is asyncio.current_task():
+            del _playback_tasks[token]
+
+
+def _spawn(coro) -> asyncio.Task:
+    """Runs coro as a task that is kept referenced until it is done."""
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def _submit_actions(jobs: list[ActionJob]):
+    for job in jobs:
+        await action_dispatcher.submit(job)
+
+
+def _session_token(name: str) -> str:
+    # Tokens must not contain "_", which separates them from state names.
+    return SESSION_TOKEN_PREFIX + name.encode().hex()
+
+
+@contextlib.asynccontextmanager
+async def _client_state(token: str):
+    app = prerequisites.get_and_validate_app().app
+    async with app.modify_state(_substate_key(token, TimelineState)) as root_state:
+        yield await root_state.get_state(TimelineState)
+
+
+@contextlib.asynccontextmanager
+async def _host_state(token: str):
+    """Locks a session host's state, which has no browser to send deltas to."""
+    state_manager = prerequisites.get_and_validate_app().app.state_manager
+    async with state_manager.modify_state(
+        _substate_key(token, TimelineState)
+    ) as root_state:
+        yield await root_state.get_state(TimelineState)
+        root_state._clean()
+
+
+@contextlib.asynccontextmanager
+async def _session_host(name: str):
+    """Locks the host of a session, broadcasting it to subscribers afterwards."""
+    async with _host_state(_session_token(name)) as host:
+        host._hosted_session = name
+        await host._attach_store()
+        yield host
+    if name not in _pending_broadcasts:
+        _pending_broadcasts.add(name)
+        _spawn(_broadcast_session(name, host))
+
+
+async def _broadcast_session(name: str, host: TimelineState):
+    """Mirrors a session's host into every subscribed client."""
+    await asyncio.sleep(0)
+    _pending_broadcasts.discard(name)
+    for token in list(_session_subscribers.get(name, ())):
+        try:
+            async with _client_state(token) as state:
+                if state.session_name != name:
+                    # The client left or its state expired.
+                    _session_subscribers[name].discard(token)
+                    continue
+                state._follow_session(host)
+        except Exception:
+            logging.exception(f"Could not update {token} from session {name}")
+
+
+async def _report_action_result(
+    token: str, epoch: int, fire: int, result: ActionResult
+):
+    """Queues an action result for the state that triggered it."""
+    pending = _pending_results.get(token)
+    if pending is None:
+        pending = _pending_results[token] = []
+        _spawn(_apply_action_results(token))
+    pending.append((epoch, fire, result))
+
+
+async def _apply_action_results(token: str):
+    """Applies the action results queued for a token under one state lock."""
+    await asyncio.sleep(RESULT_BATCH_SECONDS)
+    if token.startswith(SESSION_TOKEN_PREFIX):
+        name = bytes.fromhex(token.removeprefix(SESSION_TOKEN_PREFIX)).decode()
+        locked_state = _session_host(name)
+    else:
+        locked_state = _client_state(token)
+    try:
+        async with locked_state as state:
+            for epoch, fire, result in _pending_results.pop(token, []):
+                state._apply_action_result(epoch, fire, result)
+    except Exception:
+        _pending_results.pop(token, None)
+        logging.exception(f"Could not apply action results to {token}")
\ No newline at end of file
@@ -0,0 +1,79 @@
+// Animates the playhead between server pushes.
+//
+// The server publishes a playback anchor (position, wall time, rate, playing)
+// on the element marked with data-playback-anchor and only pushes again when
+// events fire or the user changes playback. Every frame this script derives
+// the current position from that anchor and updates the clock text, the
+// seek slider and every timeline's progress bar and playhead within its
+// zoom window. While the slider is being dragged they follow the slider.
+(function () {
+  // Accept the server's wall time as latency compensation only when the
+  // clocks look in sync; otherwise anchor at the moment the update arrived.
+  var MAX_LATENCY_MS = 250;
+  var anchorKey = null;
+  var anchorLocal = 0;
+  // Slider value shown while it is dragged, kept after release until the
+  // server answers the seek with a new anchor.
+  var scrub = null;
+
+  function formatTime(seconds) {
+    var minutes = Math.floor(seconds / 60);
+    var secs = Math.floor(seconds % 60);
+    return String(minutes).padStart(2, "0") + ":" + String(secs).padStart(2, "0");
+  }
+
+  function keyOf(anchor) {
+    var data = anchor.dataset;
+    return [data.position, data.wallTime, data.rate, data.playing].join("|");
+  }
+
+  function currentPosition(anchor) {
+    var data = anchor.dataset;
+    var position = parseFloat(data.position) || 0;
+    var wallTime = parseFloat(data.wallTime) || 0;
+    var key = keyOf(anchor);
+    if (key !== anchorKey) {
+      var latency = Date.now() - wallTime;
+      anchorKey = key;
+      anchorLocal =
+        performance.now() - (latency >= 0 && latency <= MAX_LATENCY_MS ? latency : 0);
+    }
+    if (data.playing === "true") {
+      position += ((performance.now() - anchorLocal) / 1000) * (parseFloat(data.rate) || 1);
+    }
+    return Math.min(Math.max(position, 0), parseFloat(data.max) || 0);
+  }
+
+  function frame() {
+    var anchor = document.querySelector("[data-playback-anchor]");
+    if (anchor) {
+      var dragged = document.querySelector("[data-playhead-slider]:active");
+      if (dragged) {
+        scrub = { value: parseFloat(dragged.value) || 0, key: keyOf(anchor) };
+      } else if (scrub && scrub.key !== keyOf(anchor)) {
+        scrub = null;
+      }
+      var position = scrub ? scrub.value : currentPosition(anchor);
+      document.querySelectorAll("[data-playhead-clock]").forEach(function (node) {
+        var text = formatTime(position);
+        if (node.textContent !== text) node.textContent = text;
+      });
+      document.querySelectorAll("[data-playhead-slider]").forEach(function (node) {
+        if (!node.matches(":active")) node.value = position;
+      });
+      document.querySelectorAll("[data-playhead-duration]").forEach(function (node) {
+        // Progress is relative to the timeline's zoom window.
+        var data = node.dataset;
+        var duration = parseFloat(data.playheadDuration) || 0;
+        var start = parseFloat(data.playheadStart) || 0;
+        var end = parseFloat(data.playheadEnd) || duration;
+        var percent =
+          end > start ? ((Math.min(position, duration) - start) / (end - start)) * 100 : 0;
+        node.style[data.playheadProp] = Math.min(Math.max(percent, 0), 100) + "%";
+      });
+    }
+    window.requestAnimationFrame(frame);
+  }
+
+  window.requestAnimationFrame(frame);
+})();
@@ -0,0 +1,180 @@
+import argparse
+import json
+import math
+import random
+import sys
+from typing import Iterable, Iterator
+
+from app.engine.clock import format_time
+from app.engine.event_store import EventStore
+from app.engine.importer import TIMELINE_TYPES
+
+TYPE_MIX = {"proposal": 0.45, "conflict": 0.35, "generic": 0.2}
+DISTRIBUTIONS = ("uniform", "poisson", "burst")
+# Share of the events that fall into bursts, and how long a burst lasts as
+# a fraction of the timeline, for the "burst" distribution.
+BURST_SHARE = 0.8
+BURST_WIDTH = 0.01
+# Mean length of an interval event as a fraction of the timeline.
+INTERVAL_SPAN = 0.01
+
+
+def parse_type_mix(value: str) -> dict[str, float]:
+    """Parses "proposal=0.5,conflict=0.3,generic=0.2" into weights."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def event_times(
+    count: int, duration: float, distribution: str, rng: random.Random
+) -> list[float]:
+    """Returns `count` sorted event times within (0, duration]."""
+    if distribution == "uniform":
+        times = [rng.uniform(0, duration) for _ in range(count)]
+    elif distribution == "poisson":
+        # Exponential gaps with the mean that spreads the events over the
+        # whole duration, rescaled so the last event lands inside it.
+        times, position = [], 0.0
+        for _ in range(count):
+            position += rng.expovariate(count / duration)
+            times.append(position)
+        scale = duration / max(position, duration)
+        times = [t * scale for t in times]
+    elif distribution == "burst":
+        bursts = [rng.uniform(0, duration) for _ in range(max(count // 1000, 1))]
+        width = duration * BURST_WIDTH
+        times = [
+            min(rng.choice(bursts) + rng.uniform(0, width), duration)
+            if rng.random() < BURST_SHARE
+            else rng.uniform(0, duration)
+            for _ in range(count)
+        ]
+    else:
+        raise ValueError(f"Unknown time distribution {distribution!r}")
+    times.sort()
+    return times
+
+
+def generate_rows(
+    timelines: int,
+    events: int,
+    duration: float = 3600.0,
+    type_mix: dict[str, float] | None = None,
+    distribution: str = "uniform",
+    seed: int = 0,
+    interval_share: float = 0.0,
+) -> Iterator[dict]:
+    """Yields import rows for `timelines` timelines of `events` events each.
+
+    About `interval_share` of the events get an end, with exponentially
+    distributed lengths averaging INTERVAL_SPAN of the duration.
+
+    The same arguments always yield the same rows, so a benchmark run can
+    be reproduced from its parameters alone.
+    """
+    rng = random.Random(seed)
+    type_mix = type_mix or TYPE_MIX
+    types, weights = list(type_mix), list(type_mix.values())
+    for t in range(timelines):
+        timeline_id = f"bench{t}"
+        timeline_type = TIMELINE_TYPES[t % len(TIMELINE_TYPES)]
+        event_types = rng.choices(types, weights, k=events)
+        for i, time_ in enumerate(event_times(events, duration, distribution, rng)):
+            row = {
+                "timeline_id": timeline_id,
+                "timeline_type": timeline_type,
+                "timeline_name": f"Benchmark {t}",
+                "id": f"{timeline_id}-{i}",
+                "time": time_,
+                "label": f"Event {i + 1}",
+                "type": event_types[i],
+                "description": "Synthetic benchmark event",
+            }
+            if interval_share and rng.random() < interval_share:
+                span = rng.expovariate(1 / (duration * INTERVAL_SPAN))
+                row["end"] = min(time_ + span, duration)
+            yield row
+
+
+def build_timelines(rows: Iterable[dict]) -> list[dict]:
+    """Groups generated rows into timelines as the importer builds them."""
+    timelines: dict[str, dict] = {}
+    for row in rows:
+        timeline = timelines.get(row["timeline_id"])
+        if timeline is None:
+            timeline = timelines[row["timeline_id"]] = {
+                "id": row["timeline_id"],
+                "name": row["timeline_name"],
+                "type": row["timeline_type"],
+                "events": EventStore(),
+            }
+        timeline["events"].append(
+            row["id"],
+            row["time"],
+            row["label"],
+            row["type"],
+            row["description"],
+            row.get("end"),
+        )
+    for timeline in timelines.values():
+        duration = float(math.ceil(max(timeline["events"].ends))) or 1.0
+        timeline["duration"] = duration
+        timeline["formatted_duration"] = format_time(duration)
+    return list(timelines.values())
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Adds the dataset options shared by the generator and the benchmarks."""
+    parser.add_argument("--timelines", type=int, default=100)
+    parser.add_argument("--events", type=int, default=1000, help="per timeline")
+    parser.add_argument("--duration", type=float, default=3600.0, help="seconds")
+    parser.add_argument(
+        "--type-mix",
+        type=parse_type_mix,
+        default=TYPE_MIX,
+        help='event type weights, e.g. "proposal=0.5,conflict=0.3,generic=0.2"',
+    )
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--interval-share",
+        type=float,
+        default=0.0,
+        help="share of events with an end time, drawn as spans",
+    )
+
+
+def dataset_rows(args: argparse.Namespace) -> Iterator[dict]:
+    return generate_rows(
+        args.timelines,
+        args.events,
+        args.duration,
+        args.type_mix,
+        args.distribution,
+        args.seed,
+        args.interval_share,
+    )
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic import file of N timelines x M events."
+    )
+    parser.add_argument("output", help="JSONL file to write, - for stdout")
+    add_arguments(parser)
+    args = parser.parse_args(None if argv is None else list(argv))
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for row in dataset_rows(args):
+            out.write(json.dumps(row) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,621 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+from bisect import bisect_right
+from typing import Callable, Iterable
+from urllib.parse import urlsplit
+
+import aiohttp
+import reflex as rx
+import socketio
+from reflex.constants import CompileVars
+from reflex.constants.state import FIELD_MARKER
+
+from app.states.timeline_state import TimelineState
+from benchmarks.run import git_revision, summarize
+
+RESULT_VERSION = 1
+STATE_NAME = TimelineState.get_full_name()
+HYDRATE = f"{rx.State.get_full_name()}.{CompileVars.HYDRATE}"
+ROUTER_DATA = {"pathname": "/", "query": {}, "asPath": "/"}
+# A tick is late when it reaches its client this long after the playhead
+# passed the event it fires.
+LATE_SECONDS = 0.1
+# A step is where scaling breaks when any of these is reached: p95 tick
+# lateness, share of late or dropped ticks, backend CPU in cores, or
+# commands that got no answer.
+BREAK_LATENESS_SECONDS = 0.25
+BREAK_TICK_SHARE = 0.05
+BREAK_CPU = 0.9
+
+
+def parse_counts(value: str) -> list[int]:
+    """Parses "1,5,10" into the client counts of the steps."""
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+class BackendProcess:
+    """CPU time and resident memory of the backend and its child processes.
+
+    Read from /proc, so only on Linux; the backend is found by the port it
+    listens on unless its pid is given.
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+
+    @classmethod
+    def listening_on(cls, port: int) -> "BackendProcess | None":
+        inodes = set()
+        for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+            try:
+                with open(table) as lines:
+                    next(lines)
+                    for line in lines:
+                        fields = line.split()
+                        local_port = int(fields[1].rsplit(":", 1)[1], 16)
+                        if local_port == port and fields[3] == "0A":
+                            inodes.add(f"socket:[{fields[9]}]")
+            except OSError:
+                continue
+        holders = set()
+        for pid in _pids():
+            try:
+                fds = os.listdir(f"/proc/{pid}/fd")
+            except OSError:
+                continue
+            for fd in fds:
+                try:
+                    if os.readlink(f"/proc/{pid}/fd/{fd}") in inodes:
+                        holders.add(pid)
+                        break
+                except OSError:
+                    continue
+        # A reloader and its worker both hold the socket; take the parent.
+        roots = [pid for pid in holders if _stat(pid)[1] not in holders]
+        return cls(min(roots)) if roots else None
+
+    def _tree(self) -> list[int]:
+        parents = {}
+        for pid in _pids():
+            try:
+                parents[pid] = _stat(pid)[1]
+            except OSError:
+                continue
+        tree, frontier = [self.pid], [self.pid]
+        while frontier:
+            frontier = [pid for pid, ppid in parents.items() if ppid in frontier]
+            tree += frontier
+        return tree
+
+    def cpu_seconds(self) -> float:
+        ticks = 0
+        for pid in self._tree():
+            try:
+                fields = _stat(pid)
+            except OSError:
+                continue
+            ticks += int(fields[11]) + int(fields[12])
+        return ticks / os.sysconf("SC_CLK_TCK")
+
+    def rss_bytes(self) -> int:
+        pages = 0
+        for pid in self._tree():
+            try:
+                with open(f"/proc/{pid}/statm") as statm:
+                    pages += int(statm.read().split()[1])
+            except OSError:
+                continue
+        return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _pids() -> list[int]:
+    return [int(name) for name in os.listdir("/proc") if name.isdigit()]
+
+
+def _stat(pid: int) -> list[str]:
+    """Returns the fields of /proc/<pid>/stat after the command name."""
+    with open(f"/proc/{pid}/stat") as stat:
+        return stat.read().rsplit(")", 1)[1].split()
+
+
+def parse_metrics(text: str) -> dict[str, float]:
+    """Parses the Prometheus text format into values by series name."""
+    series = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            series[name] = float(value)
+    return series
+
+
+def histogram_quantile(
+    before: dict, after: dict, name: str, quantile: float
+) -> float | None:
+    """Upper bound of the bucket holding the quantile of what a step observed.
+
+    None when nothing was observed or the quantile is above the last bucket.
+    """
+    count = after.get(f"{name}_count", 0) - before.get(f"{name}_count", 0)
+    if count <= 0:
+        return None
+    bounds = sorted(
+        float(key.split('"')[1])
+        for key in after
+        if key.startswith(f"{name}_bucket") and "+Inf" not in key
+    )
+    for bound in bounds:
+        key = f'{name}_bucket{{le="{bound}"}}'
+        if after.get(key, 0) - before.get(key, 0) >= quantile * count:
+            return bound
+    return None
+
+
+def server_metrics(before: dict, after: dict) -> dict:
+    """Summarizes the backend's own playback metrics over one step."""
+
+    def delta(name: str) -> float:
+        return after.get(name, 0) - before.get(name, 0)
+
+    ticks = delta("timeline_tick_seconds_count")
+    return {
+        "ticks": ticks,
+        "events_fired": delta("timeline_events_fired_total"),
+        "tick_seconds_mean": delta("timeline_tick_seconds_sum") / ticks
+        if ticks
+        else None,
+        "tick_seconds_p95": histogram_quantile(
+            before, after, "timeline_tick_seconds", 0.95
+        ),
+        "tick_drift_seconds_p95": histogram_quantile(
+            before, after, "timeline_tick_drift_seconds", 0.95
+        ),
+        "submit_seconds_p95": histogram_quantile(
+            before, after, "timeline_action_submit_seconds", 0.95
+        ),
+        "delta_bytes_p95": histogram_quantile(
+            before, after, "timeline_delta_bytes", 0.95
+        ),
+        "queued_actions": after.get("timeline_actions_queued"),
+        "blocked_submits": delta("timeline_actions_blocked_submits"),
+    }
+
+
+class SimulatedClient:
+    """One dashboard tab driving the app's real event handlers over websocket.
+
+    It speaks the protocol of the Reflex frontend: it hydrates, sends
+    events with its token and sends back the events the backend returns,
+    such as the playback loop. Commands are timed until the var they change
+    arrives. Tick updates are timed against the events they fire, whose
+    times the client reads back from the dots of its track layers.
+    """
+
+    def __init__(self, url: str, args: argparse.Namespace, rng: random.Random):
+        self.url = url
+        self.args = args
+        self.rng = rng
+        self.token = str(uuid.uuid4())
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.sio.on("event", self._on_update, namespace="/_event")
+        self.vars: dict = {}
+        self.waiters: list[tuple[Callable[[dict], bool], asyncio.Future]] = []
+        self.latencies: dict[str, list[float]] = {
+            "load_window": [],
+            "seek": [],
+            "play": [],
+            "stop": [],
+            "add_timeline": [],
+        }
+        self.timeouts = 0
+        self.event_times: list[float] = []
+        self.lateness: list[float] = []
+        self.ticks = 0
+        self.expected_ticks = 0
+        self.error: str | None = None
+
+    async def _send(self, name: str, payload: dict | None = None):
+        await self.sio.emit(
+            "event",
+            {
+                "token": self.token,
+                "name": name,
+                "payload": payload or {},
+                "router_data": ROUTER_DATA,
+            },
+            namespace="/_event",
+        )
+
+    async def _on_update(self, data):
+        received = time.time()
+        update = json.loads(data) if isinstance(data, str) else data
+        delta = {
+            name.removesuffix(FIELD_MARKER): value
+            for name, value in update.get("delta", {}).get(STATE_NAME, {}).items()
+        }
+        anchor = self.vars.get("playback_anchor")
+        if "playback_anchor" in delta:
+            self._close_segment(anchor, delta["playback_anchor"])
+        elif "global_current_time" in delta and anchor and anchor["is_playing"]:
+            self._observe_tick(anchor, delta["global_current_time"], received)
+        self.vars.update(delta)
+        if "timeline_layers" in delta or "timeline_views" in delta:
+            self._read_event_times()
+        for waiter in list(self.waiters):
+            check, future = waiter
+            if not future.done() and check(self.vars):
+                future.set_result(None)
+        for event in update.get("events", []):
+            # Frontend-only events have no state prefix.
+            if "." in event["name"]:
+                await self._send(event["name"], event.get("payload"))
+
+    def _read_event_times(self):
+        """Collects the start and end times of the events on the tracks."""
+        times = set()
+        views = self.vars.get("timeline_views", {})
+        for timeline_id, layer in self.vars.get("timeline_layers", {}).items():
+            view = views.get(timeline_id)
+            if view is None:
+                continue
+            span = view["end"] - view["start"]
+            for dot in layer["dots"]:
+                if dot["left"] > 0:
+                    times.add(view["start"] + dot["left"] / 100 * span)
+                if dot["width"] > 0:
+                    times.add(dot["end"])
+        self.event_times = sorted(times)
+
+    def _observe_tick(self, anchor: dict, position: float, received: float):
+        """Times a tick against the first event it fired."""
+        self.ticks += 1
+        previous = self.vars.get("global_current_time", anchor["position"])
+        n = bisect_right(self.event_times, previous)
+        fired_at = position
+        if n < len(self.event_times) and self.event_times[n] <= position:
+            fired_at = self.event_times[n]
+        due = (
+            anchor["wall_time"] / 1000
+            + (fired_at - anchor["position"]) / anchor["rate"]
+        )
+        self.lateness.append(received - due)
+
+    def _close_segment(self, anchor: dict | None, new_anchor: dict):
+        """Counts the distinct event times the playhead passed while playing."""
+        if not anchor or not anchor["is_playing"]:
+            return
+        end = (
+            anchor["position"]
+            + (new_anchor["wall_time"] - anchor["wall_time"]) / 1000 * anchor["rate"]
+        )
+        if new_anchor["position"] >= self.vars.get("global_max_duration", end):
+            end = new_anchor["position"]
+        self.expected_ticks += max(
+            bisect_right(self.event_times, end)
+            - bisect_right(self.event_times, anchor["position"]),
+            0,
+        )
+
+    async def command(
+        self,
+        kind: str,
+        name: str,
+        payload: dict | None,
+        done: Callable[[dict], bool],
+    ):
+        """Sends an event and records how long until `done` holds for the vars."""
+        future = asyncio.get_running_loop().create_future()
+        waiter = (done, future)
+        self.waiters.append(waiter)
+        started = time.perf_counter()
+        await self._send(f"{STATE_NAME}.{name}", payload)
+        try:
+            await asyncio.wait_for(future, self.args.timeout)
+            self.latencies[kind].append(time.perf_counter() - started)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+        finally:
+            self.waiters.remove(waiter)
+
+    def _anchor(self, vars: dict) -> dict:
+        return vars.get("playback_anchor", {})
+
+    async def _connect(self):
+        await self.sio.connect(
+            f"{self.url}?token={self.token}",
+            socketio_path="/_event",
+            transports=["websocket"],
+            namespaces=["/_event"],
+        )
+        await self._send(HYDRATE)
+        await self.command(
+            "load_window",
+            "load_timeline_window",
+            None,
+            lambda vars: "timeline_layers" in vars,
+        )
+        for n in range(self.args.timelines_per_client):
+            total = self.vars.get("timeline_total", 0)
+            await self._send(
+                f"{STATE_NAME}.set_new_timeline_name", {"value": f"Load {n + 1}"}
+            )
+            await self.command(
+                "add_timeline",
+                "add_timeline",
+                None,
+                lambda vars: vars.get("timeline_total", 0) > total,
+            )
+        await self._send(
+            f"{STATE_NAME}.set_playback_rate", {"value": str(self.args.rate)}
+        )
+
+    async def _play(self):
+        await self.command(
+            "play",
+            "global_toggle_play",
+            None,
+            lambda vars: self._anchor(vars).get("is_playing", False),
+        )
+
+    async def _seek(self):
+        position = round(self.rng.uniform(0, self.vars["global_max_duration"]), 3)
+        await self.command(
+            "seek",
+            "global_seek",
+            {"value": str(position)},
+            lambda vars: abs(vars.get("global_current_time", -1) - position) < 1e-6,
+        )
+
+    async def run(self, start_after: float, until: float):
+        """Connects after `start_after` seconds and plays and seeks until `until`."""
+        await asyncio.sleep(start_after)
+        try:
+            await self._connect()
+            await self._play()
+            while time.monotonic() < until:
+                await asyncio.sleep(
+                    min(
+                        self.rng.expovariate(1 / self.args.seek_every),
+                        max(until - time.monotonic(), 0),
+                    )
+                )
+                if time.monotonic() >= until:
+                    break
+                if self._anchor(self.vars).get("is_playing"):
+                    await self._seek()
+                else:
+                    # Playback reached the end; playing again restarts it.
+                    await self._play()
+            await self.command(
+                "stop",
+                "global_stop",
+                None,
+                lambda vars: (
+                    not self._anchor(vars).get("is_playing", True)
+                    and self._anchor(vars).get("position") == 0
+                ),
+            )
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            if self.sio.connected:
+                await self.sio.disconnect()
+
+
+async def scrape(session: aiohttp.ClientSession, url: str) -> dict[str, float]:
+    """Returns the backend's /metrics, or nothing when it has none."""
+    try:
+        async with session.get(f"{url}/metrics") as response:
+            if response.status != 200:
+                return {}
+            return parse_metrics(await response.text())
+    except aiohttp.ClientError:
+        return {}
+
+
+async def run_step(
+    clients: int,
+    args: argparse.Namespace,
+    backend: BackendProcess | None,
+    http: aiohttp.ClientSession,
+) -> dict:
+    """Runs `clients` simulated dashboards at once and returns what they saw."""
+    rng = random.Random(f"{args.seed}-{clients}")
+    metrics_before = await scrape(http, args.url)
+    rss_before = backend.rss_bytes() if backend else None
+    cpu_before = backend.cpu_seconds() if backend else None
+    harness_before = time.process_time()
+    started = time.monotonic()
+    until = started + args.ramp_seconds + args.step_seconds
+    simulated = [
+        SimulatedClient(args.url, args, random.Random(rng.random()))
+        for _ in range(clients)
+    ]
+    peak_rss = rss_before or 0
+
+    async def sample_memory():
+        nonlocal peak_rss
+        while True:
+            await asyncio.sleep(1.0)
+            peak_rss = max(peak_rss, backend.rss_bytes())
+
+    sampler = asyncio.create_task(sample_memory()) if backend else None
+    await asyncio.gather(
+        *(
+            client.run(args.ramp_seconds * n / clients, until)
+            for n, client in enumerate(simulated)
+        )
+    )
+    if sampler is not None:
+        sampler.cancel()
+    wall = time.monotonic() - started
+    failed = [client.error for client in simulated if client.error]
+    lateness = [s for client in simulated for s in client.lateness]
+    ticks = sum(client.ticks for client in simulated)
+    expected = sum(client.expected_ticks for client in simulated)
+    late = sum(s > LATE_SECONDS for s in lateness)
+    step = {
+        "clients": clients,
+        "failed_clients": len(failed),
+        "errors": failed[:5],
+        "seconds": wall,
+        "command_timeouts": sum(client.timeouts for client in simulated),
+        "tick_lateness_seconds": summarize(lateness),
+        "ticks": ticks,
+        "late_ticks": late,
+        "dropped_ticks": max(expected - ticks, 0),
+        "expected_ticks": expected,
+        "harness_cpu": (time.process_time() - harness_before) / wall,
+    }
+    for kind in ("load_window", "add_timeline", "seek", "play", "stop"):
+        step[f"{kind}_seconds"] = summarize(
+            [s for client in simulated for s in client.latencies[kind]]
+        )
+    step["event_seconds"] = summarize(
+        [s for client in simulated for kind in client.latencies.values() for s in kind]
+    )
+    if backend:
+        rss_after = backend.rss_bytes()
+        step["backend_cpu"] = (backend.cpu_seconds() - cpu_before) / wall
+        step["backend_rss_bytes"] = rss_after
+        step["backend_peak_rss_bytes"] = peak_rss
+        step["rss_per_session_bytes"] = max(peak_rss - rss_before, 0) / clients
+    metrics_after = await scrape(http, args.url)
+    if metrics_after:
+        step["server"] = server_metrics(metrics_before, metrics_after)
+    step["breaks"] = break_reasons(step)
+    return step
+
+
+def break_reasons(step: dict) -> list[str]:
+    """Returns why a step counts as past the point where scaling breaks."""
+    reasons = []
+    if step["failed_clients"]:
+        reasons.append(f"{step['failed_clients']} clients failed")
+    if step["command_timeouts"]:
+        reasons.append(f"{step['command_timeouts']} commands unanswered")
+    lateness = step["tick_lateness_seconds"]
+    if lateness["count"] and lateness["p95"] >= BREAK_LATENESS_SECONDS:
+        reasons.append(f"tick lateness p95 {lateness['p95'] * 1000:.0f} ms")
+    expected = max(step["expected_ticks"], step["ticks"], 1)
+    if step["late_ticks"] / expected >= BREAK_TICK_SHARE:
+        reasons.append(f"{step['late_ticks'] / expected:.0%} ticks late")
+    if step["dropped_ticks"] / expected >= BREAK_TICK_SHARE:
+        reasons.append(f"{step['dropped_ticks'] / expected:.0%} ticks dropped")
+    if step.get("backend_cpu", 0) >= BREAK_CPU:
+        reasons.append(f"backend CPU {step['backend_cpu']:.0%}")
+    return reasons
+
+
+def describe_step(step: dict) -> str:
+    event = step["event_seconds"]
+    lateness = step["tick_lateness_seconds"]
+    parts = [f"N={step['clients']:>4}"]
+    if "backend_cpu" in step:
+        parts.append(f"cpu {step['backend_cpu']:>4.0%}")
+        parts.append(f"rss/session {step['rss_per_session_bytes'] / 2**20:6.2f} MiB")
+    if event["count"]:
+        parts.append(f"event p95 {event['p95'] * 1000:7.1f} ms")
+    if lateness["count"]:
+        parts.append(f"tick late p95 {lateness['p95'] * 1000:7.1f} ms")
+    parts.append(f"late {step['late_ticks']}/{step['ticks']} ticks")
+    parts.append(f"dropped {step['dropped_ticks']}")
+    parts.append("; ".join(step["breaks"]) or "ok")
+    return "  ".join(parts)
+
+
+async def _run(args: argparse.Namespace) -> list[dict]:
+    backend = None
+    if args.pid:
+        backend = BackendProcess(args.pid)
+    elif sys.platform.startswith("linux"):
+        backend = BackendProcess.listening_on(urlsplit(args.url).port or 80)
+    if backend is None:
+        print(
+            "Backend process not found; CPU and memory are not measured.",
+            file=sys.stderr,
+        )
+    steps = []
+    async with aiohttp.ClientSession() as http:
+        for clients in args.clients:
+            step = await run_step(clients, args, backend, http)
+            steps.append(step)
+            print(describe_step(step), file=sys.stderr)
+            if step["breaks"] and args.stop_on_break:
+                break
+            await asyncio.sleep(args.cooldown_seconds)
+    return steps
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Load-test a running backend with N simulated dashboards per step."
+    )
+    parser.add_argument("--url", default="http://localhost:8000", help="backend URL")
+    parser.add_argument(
+        "--clients",
+        type=parse_counts,
+        default=[1, 5, 10, 25, 50, 100],
+        help='concurrent clients of each step, e.g. "1,10,100"',
+    )
+    parser.add_argument("--step-seconds", type=float, default=20.0)
+    parser.add_argument(
+        "--ramp-seconds", type=float, default=2.0, help="to connect a step's clients"
+    )
+    parser.add_argument(
+        "--cooldown-seconds", type=float, default=2.0, help="pause between steps"
+    )
+    parser.add_argument("--rate", type=float, default=8.0, help="playback rate")
+    parser.add_argument(
+        "--seek-every", type=float, default=3.0, help="mean seconds between seeks"
+    )
+    parser.add_argument("--timelines-per-client", type=int, default=2)
+    parser.add_argument(
+        "--timeout", type=float, default=10.0, help="seconds to wait for a command"
+    )
+    parser.add_argument("--pid", type=int, help="backend pid, found by port if unset")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--stop-on-break", action="store_true", help="stop at the first failing step"
+    )
+    parser.add_argument("--output", default="load.json", help="JSON result file")
+    args = parser.parse_args(None if argv is None else list(argv))
+
+    steps = asyncio.run(_run(args))
+    breaking = next((step for step in steps if step["breaks"]), None)
+    result = {
+        "version": RESULT_VERSION,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.time(),
+        "params": {
+            name: value for name, value in vars(args).items() if name != "output"
+        },
+        "steps": steps,
+        "breaks_at": breaking["clients"] if breaking else None,
+    }
+    with open(args.output, "w") as out:
+        json.dump(result, out, indent=2)
+    if breaking:
+        print(
+            f"Scaling breaks at {breaking['clients']} clients: "
+            f"{'; '.join(breaking['breaks'])} -> {args.output}",
+            file=sys.stderr,
+        )
+    else:
+        print(
+            f"No breaking point up to {steps[-1]['clients']} clients -> {args.output}",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
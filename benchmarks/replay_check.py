@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import sys
+from typing import Iterable
+
+from app.engine.replay import ParallelReplay, ReplayEngine, encode_row
+from benchmarks.generator import add_arguments, build_timelines, dataset_rows
+from benchmarks.run import TimelineStateTarget
+
+
+def tied_rows() -> list[dict]:
+    """Small timelines that all start at t=5, so every second is a tie.
+
+    The first events of "b" are intervals ending at t=7, tied with events
+    starting there.
+    """
+    rows = []
+    for timeline_id, count in (("a", 1), ("b", 5), ("c", 3), ("d", 3)):
+        for i in range(count):
+            rows.append(
+                {
+                    "timeline_id": timeline_id,
+                    "timeline_name": timeline_id,
+                    "timeline_type": "conflict_id",
+                    "id": f"{timeline_id}{i}",
+                    "time": 5.0 + i,
+                    "end": 7.0 if timeline_id == "b" and i < 2 else None,
+                    "label": f"{timeline_id}{i}",
+                    "type": "conflict",
+                    "description": "",
+                }
+            )
+    return rows
+
+
+def crossing_rows() -> list[dict]:
+    """One timeline where an interval event ends between two other events.
+
+    A single tick past t=30 crosses the start of e1 at 10, its end at 20
+    and the start of e3 at 30.
+    """
+    return [
+        {
+            "timeline_id": "x",
+            "timeline_name": "x",
+            "timeline_type": "conflict_id",
+            "id": event_id,
+            "time": time_,
+            "end": end,
+            "label": event_id,
+            "type": "conflict",
+            "description": "",
+        }
+        for event_id, time_, end in (("e1", 10.0, 20.0), ("e3", 30.0, None))
+    ]
+
+
+def tick_logs(timelines: list[dict]) -> dict[str, list[tuple[str, str]]]:
+    """Plays to the end in one tick and returns each timeline's log, oldest first.
+
+    Rows are (event label, action); the UI stamps them with the tick's
+    position rather than the event's time.
+    """
+    state = TimelineStateTarget(timelines).state
+    state._clock.seek(state.global_max_duration)
+    state._tick()
+    return {
+        timeline_id: [
+            (row["event_label"], row["action"])
+            for row in reversed(store.page(0, store.available))
+        ]
+        for timeline_id, store in state._log_stores.items()
+    }
+
+
+def replay_logs(timelines: list[dict]) -> dict[str, list[tuple[str, str]]]:
+    """Replays fast-forward and returns each timeline's log like tick_logs."""
+    logs: dict[str, list[tuple[str, str]]] = {}
+    engine = ReplayEngine(
+        timelines,
+        on_log=lambda timeline_id, row: logs.setdefault(timeline_id, []).append(
+            (row["event_label"], row["action"])
+        ),
+    )
+    asyncio.run(engine.run())
+    return logs
+
+
+def replay_lines(timelines: list[dict], workers: int) -> list[str]:
+    """Replays fast-forward and returns the JSON log lines in output order."""
+    lines: list[str] = []
+    if workers > 1:
+        engine = ParallelReplay(timelines, workers, on_line=lines.append)
+    else:
+        engine = ReplayEngine(
+            timelines,
+            on_log=lambda timeline_id, row: lines.append(encode_row(timeline_id, row)),
+        )
+    asyncio.run(engine.run())
+    return lines
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check that parallel replay and a playback tick write the "
+        "same log as one replay worker."
+    )
+    add_arguments(parser)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(None if argv is None else list(argv))
+    datasets = {
+        "tied": build_timelines(tied_rows()),
+        "crossing": build_timelines(crossing_rows()),
+        "generated": build_timelines(dataset_rows(args)),
+    }
+    failed = False
+    for name, timelines in datasets.items():
+        expected = replay_lines(timelines, 1)
+        for workers in range(2, args.workers + 1):
+            if replay_lines(timelines, workers) != expected:
+                print(f"{name}: {workers} workers differ from 1", file=sys.stderr)
+                failed = True
+        replayed = replay_logs(timelines)
+        for timeline_id, logged in tick_logs(timelines).items():
+            # The UI keeps only the newest rows of long logs.
+            if logged != replayed.get(timeline_id, [])[-len(logged) :]:
+                print(f"{name}: tick order differs on {timeline_id}", file=sys.stderr)
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
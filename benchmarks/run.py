@@ -0,0 +1,242 @@
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from typing import Callable, Iterable
+
+from reflex.utils.format import json_dumps
+
+from app.states.timeline_state import SEEK_MODES, TimelineState
+from benchmarks.generator import add_arguments, build_timelines, dataset_rows
+
+RESULT_VERSION = 1
+
+
+class TimelineStateTarget:
+    """Drives the current TimelineState directly, without a server or browser.
+
+    Another engine is benchmarked by passing a class with the same methods
+    as --target; the suite only talks to it through them.
+    """
+
+    name = "TimelineState"
+
+    def __init__(self, timelines: list[dict], seek_mode: str = "skip"):
+        self.state = TimelineState(_reflex_internal_init=True)
+        self.state._timelines = []
+        self.state._timeline_events = {}
+        self.state.seek_mode = seek_mode
+        for timeline in timelines:
+            self.state._register_timeline(timeline)
+        self.state._calculate_max_duration()
+        self.state._republish_window()
+
+    @property
+    def duration(self) -> float:
+        return self.state.global_max_duration
+
+    def tick(self) -> bool:
+        """Runs one playback tick at the next event, as the playback loop would.
+
+        Returns False once playback reached the end.
+        """
+        state = self.state
+        state._clock.seek(state._clock.position() + state._seconds_until_next_event())
+        state._tick()
+        return state._clock.position() < state.global_max_duration
+
+    def seek(self, position: float):
+        self.state.global_seek(str(position))
+
+    def add_timeline(self) -> str:
+        self.state.new_timeline_name = "Benchmark timeline"
+        self.state.add_timeline()
+        return self.state._timelines[-1]["id"]
+
+    def delete_timeline(self, timeline_id: str):
+        self.state.delete_timeline(timeline_id)
+
+    def delta_bytes(self) -> int:
+        """Serializes the pending state delta as it would be sent, then clears it."""
+        size = len(json_dumps(self.state.get_delta()).encode())
+        self.state._clean()
+        return size
+
+    def stored_bytes(self) -> int:
+        return sum(events.nbytes for events in self.state._timeline_events.values())
+
+
+def rss_bytes() -> int:
+    """Returns the resident set size, or the peak where it cannot be read."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def summarize(samples: list[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)],
+        "max": ordered[-1],
+    }
+
+
+def timed(operation: Callable, *args) -> tuple[float, object]:
+    started = time.perf_counter()
+    result = operation(*args)
+    return time.perf_counter() - started, result
+
+
+def run_suite(target_class: type, args: argparse.Namespace) -> dict:
+    """Runs every measurement against one target and returns the metrics.
+
+    Latencies are in seconds, sizes in bytes.
+    """
+    rss_before = rss_bytes()
+    timelines = build_timelines(dataset_rows(args))
+    load_seconds, target = timed(target_class, timelines, args.seek_mode)
+    metrics = {
+        "load_seconds": load_seconds,
+        "rss_bytes": rss_bytes(),
+        "rss_growth_bytes": rss_bytes() - rss_before,
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "event_store_bytes": target.stored_bytes(),
+        "initial_delta_bytes": target.delta_bytes(),
+    }
+
+    tick_seconds, tick_bytes = [], []
+    playing = True
+    while playing and len(tick_seconds) < args.ticks:
+        seconds, playing = timed(target.tick)
+        tick_seconds.append(seconds)
+        tick_bytes.append(target.delta_bytes())
+    metrics["tick_seconds"] = summarize(tick_seconds)
+    metrics["tick_delta_bytes"] = summarize(tick_bytes)
+
+    rng = random.Random(args.seed)
+    seek_seconds, seek_bytes = [], []
+    for _ in range(args.seeks):
+        seconds, _ = timed(target.seek, rng.uniform(0, target.duration))
+        seek_seconds.append(seconds)
+        seek_bytes.append(target.delta_bytes())
+    metrics["seek_seconds"] = summarize(seek_seconds)
+    metrics["seek_delta_bytes"] = summarize(seek_bytes)
+
+    add_seconds, delete_seconds = [], []
+    for _ in range(args.edits):
+        seconds, timeline_id = timed(target.add_timeline)
+        add_seconds.append(seconds)
+        target.delta_bytes()
+        seconds, _ = timed(target.delete_timeline, timeline_id)
+        delete_seconds.append(seconds)
+        target.delta_bytes()
+    metrics["add_timeline_seconds"] = summarize(add_seconds)
+    metrics["delete_timeline_seconds"] = summarize(delete_seconds)
+    return metrics
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, metrics: dict) -> dict[str, float]:
+    """Returns each metric divided by the baseline's, medians for distributions."""
+    ratios = {}
+    for name, value in metrics.items():
+        old = baseline.get("metrics", {}).get(name)
+        if isinstance(value, dict):
+            value, old = value.get("p50"), (old or {}).get("p50")
+        if value is not None and old:
+            ratios[name] = value / old
+    return ratios
+
+
+def load_target(spec: str) -> type:
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+async def _run(target_class: type, args: argparse.Namespace) -> dict:
+    # Batch seeks schedule their actions as tasks, so the suite runs inside
+    # an event loop; tasks still pending are cancelled when it closes.
+    return run_suite(target_class, args)
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark tick, seek and state-delta cost on synthetic timelines."
+    )
+    add_arguments(parser)
+    parser.add_argument("--ticks", type=int, default=500, help="ticks to measure")
+    parser.add_argument("--seeks", type=int, default=200, help="seeks to measure")
+    parser.add_argument(
+        "--edits", type=int, default=20, help="timelines to add and delete"
+    )
+    parser.add_argument("--seek-mode", choices=SEEK_MODES, default="skip")
+    parser.add_argument(
+        "--target",
+        default="benchmarks.run:TimelineStateTarget",
+        help="module:Class of the engine to benchmark",
+    )
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument(
+        "--output",
+        default="benchmark.json",
+        help="file to write the JSON result to (stdout may carry Reflex warnings)",
+    )
+    args = parser.parse_args(None if argv is None else list(argv))
+
+    target_class = load_target(args.target)
+    metrics = asyncio.run(_run(target_class, args))
+    result = {
+        "version": RESULT_VERSION,
+        "target": getattr(target_class, "name", args.target),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.time(),
+        "params": {
+            name: value
+            for name, value in vars(args).items()
+            if name not in ("baseline", "output")
+        },
+        "metrics": metrics,
+    }
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            result["baseline_ratios"] = compare(json.load(baseline), metrics)
+    with open(args.output, "w") as out:
+        json.dump(result, out, indent=2)
+    print(
+        f"{result['target']}: tick p50 {metrics['tick_seconds']['p50'] * 1000:.2f} ms, "
+        f"seek p50 {metrics['seek_seconds']['p50'] * 1000:.2f} ms, "
+        f"RSS {metrics['rss_bytes'] / 2**20:.0f} MiB -> {args.output}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file